@@ -0,0 +1,17 @@
+""" Shared ABI loading so each metadata file is only parsed once per process,
+no matter how many scripts or helpers ask for it.
+"""
+import json
+from functools import lru_cache
+from pathlib import Path
+
+ME = Path(__file__).resolve()
+METADATA_DIR = ME.parent.joinpath('metadata')
+
+
+@lru_cache(maxsize=None)
+def load_abi(name):
+    """ Get the ABI from metadata/<name>.json """
+    return json.loads(
+        METADATA_DIR.joinpath('{}.json'.format(name)).read_bytes()
+    ).get('abi')
@@ -1,13 +1,14 @@
 import sys
-import json
+import shelve
+from functools import lru_cache
 from pathlib import Path
 from argparse import ArgumentParser
 from web3 import Web3
+from abi_cache import load_abi
 
 ME = Path(__file__).resolve()
-OUSD_ABI = json.load(
-    ME.parent.joinpath('metadata/OUSD.json').open()
-).get('abi')
+OUSD_ABI = load_abi('OUSD')
+CPT_CACHE_DB = ME.parent.joinpath('cache', 'credits_per_token')
 
 
 def parse_args(argv):
@@ -30,15 +31,41 @@ def normalize_block(bn):
     return int(bn)
 
 
+@lru_cache(maxsize=None)
+def get_chain_id(endpoint):
+    return Web3(Web3.HTTPProvider(endpoint)).eth.chain_id
+
+
+def get_credits_per_token(endpoint, address, block):
+    web3 = Web3(Web3.HTTPProvider(endpoint))
+    token = web3.eth.contract(address=address, abi=OUSD_ABI)
+    return int(token.functions.rebasingCreditsPerToken().call(
+        block_identifier=block
+    ), 16)
+
+
+def get_credits_per_token_cached(endpoint, address, block):
+    """ Historical blocks never change, so only ask the node once for each """
+    if not isinstance(block, int):
+        return get_credits_per_token(endpoint, address, block)
+
+    CPT_CACHE_DB.parent.mkdir(parents=True, exist_ok=True)
+    # Key on the chain rather than the endpoint, whose URL may hold an API key
+    key = '{}:{}:{}'.format(get_chain_id(endpoint), address, block)
+
+    with shelve.open(str(CPT_CACHE_DB)) as cache:
+        if key not in cache:
+            cache[key] = get_credits_per_token(endpoint, address, block)
+        return cache[key]
+
+
 def main():
     args = parse_args(sys.argv[1:])
-    web3 = Web3(Web3.HTTPProvider(args.endpoint))
-    token = web3.eth.contract(address=args.address, abi=OUSD_ABI)
-    print(
-        int(token.functions.rebasingCreditsPerToken().call(
-            block_identifier=normalize_block(args.block)
-        ), 16)
-    )
+    print(get_credits_per_token_cached(
+        args.endpoint,
+        args.address,
+        normalize_block(args.block)
+    ))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,130 @@
+""" Local SQLite cache for event logs so that re-runs only need to fetch logs
+for blocks they have not seen before.
+
+Logs are cached per contract address, topic filter and starting block.  The
+blocks we query are long final, so cached logs never need to be invalidated.
+"""
+import json
+import sqlite3
+from pathlib import Path
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from logs import get_logs_chunked
+
+ME = Path(__file__).resolve()
+EVENT_CACHE_DB = ME.parent.joinpath('cache', 'events.sqlite')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    address TEXT NOT NULL,
+    topics_key TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    block_hash TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    tx_index INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    topics_json TEXT NOT NULL,
+    data_hex TEXT NOT NULL,
+    PRIMARY KEY (address, topics_key, tx_hash, log_index)
+);
+CREATE TABLE IF NOT EXISTS synced (
+    address TEXT NOT NULL,
+    topics_key TEXT NOT NULL,
+    from_block INTEGER NOT NULL,
+    to_block INTEGER NOT NULL,
+    PRIMARY KEY (address, topics_key, from_block)
+);
+"""
+
+
+def connect(db_path):
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def row_to_log(address, row):
+    """ Rebuild a log entry in the shape web3.py's processLog() expects """
+    [
+        block_number,
+        block_hash,
+        tx_hash,
+        tx_index,
+        log_index,
+        topics_json,
+        data_hex
+    ] = row
+
+    return AttributeDict({
+        'address': address,
+        'blockNumber': block_number,
+        'blockHash': HexBytes(block_hash),
+        'transactionHash': HexBytes(tx_hash),
+        'transactionIndex': tx_index,
+        'logIndex': log_index,
+        'topics': [HexBytes(t) for t in json.loads(topics_json)],
+        'data': data_hex,
+    })
+
+
+def get_events_cached(web3, address, topics, from_block, to_block,
+                      db_path=EVENT_CACHE_DB):
+    """ Get all logs for the given address and topics between from_block and
+    to_block (inclusive), only asking the node for blocks not yet cached.
+    """
+    address = Web3.toChecksumAddress(address)
+    topics_key = json.dumps(topics)
+    conn = connect(db_path)
+
+    with conn:
+        synced = conn.execute(
+            'SELECT to_block FROM synced '
+            'WHERE address = ? AND topics_key = ? AND from_block = ?',
+            (address, topics_key, from_block)
+        ).fetchone()
+        fetch_from = from_block if synced is None else synced[0] + 1
+
+        if fetch_from <= to_block:
+            new_logs = get_logs_chunked(
+                web3,
+                address,
+                topics,
+                fetch_from,
+                to_block
+            )
+            conn.executemany(
+                'INSERT OR IGNORE INTO logs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (
+                        address,
+                        topics_key,
+                        log['blockNumber'],
+                        log['blockHash'].hex(),
+                        log['transactionHash'].hex(),
+                        log['transactionIndex'],
+                        log['logIndex'],
+                        json.dumps([t.hex() for t in log['topics']]),
+                        log['data'],
+                    )
+                    for log in new_logs
+                ]
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO synced VALUES (?, ?, ?, ?)',
+                (address, topics_key, from_block, to_block)
+            )
+
+    rows = conn.execute(
+        'SELECT block_number, block_hash, tx_hash, tx_index, log_index, '
+        'topics_json, data_hex FROM logs '
+        'WHERE address = ? AND topics_key = ? '
+        'AND block_number BETWEEN ? AND ? '
+        'ORDER BY block_number, log_index',
+        (address, topics_key, from_block, to_block)
+    ).fetchall()
+    conn.close()
+
+    return [row_to_log(address, row) for row in rows]
@@ -0,0 +1,224 @@
+""" Helpers for talking JSON-RPC to the node directly when web3.py does not
+give us what we need, like batched requests.
+"""
+import asyncio
+from functools import lru_cache
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from eth_abi import decode_abi
+from hexbytes import HexBytes
+from web3 import Web3
+from web3._utils.method_formatters import receipt_formatter
+from web3.datastructures import AttributeDict
+
+# Most providers cap the number of requests in a single batch
+BATCH_SIZE = 500
+# Concurrent requests in flight, within what hosted nodes tolerate
+MAX_CONCURRENT_REQUESTS = 16
+# Keep-alive connections per endpoint, enough for the worker threads
+HTTP_POOL_SIZE = 32
+HTTP_RETRIES = 3
+HTTP_TIMEOUT = 30
+# JSON-RPC error code for a method the node doesn't have
+METHOD_NOT_FOUND = -32601
+
+
+@lru_cache(maxsize=None)
+def get_session(endpoint):
+    """ A keep-alive session per endpoint that asks for gzipped responses """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=HTTP_RETRIES
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'Accept-Encoding': 'gzip'})
+    return session
+
+
+def make_web3(endpoint):
+    """ Web3 on the shared session for the endpoint, without the middleware
+    that asks the node for its chain id before every eth_call and the gas
+    middlewares we have no use for when only reading
+    """
+    web3 = Web3(Web3.HTTPProvider(
+        endpoint,
+        request_kwargs={'timeout': HTTP_TIMEOUT},
+        session=get_session(endpoint)
+    ))
+
+    for name in ('validation', 'gas_price_strategy', 'gas_estimate'):
+        web3.middleware_onion.remove(name)
+
+    return web3
+
+
+def to_block_identifier(block_number):
+    """ Convert a block number to the form expected by JSON-RPC """
+    if isinstance(block_number, int):
+        return hex(block_number)
+    return block_number
+
+
+def get_output_types(contract, fn_name):
+    """ Get the ABI output types for a contract function """
+    fn_abi = contract.get_function_by_name(fn_name).abi
+    return [output['type'] for output in fn_abi['outputs']]
+
+
+def decode_output(output_types, data):
+    """ Decode function return data like web3.py does, as a tuple """
+    return tuple(
+        Web3.toChecksumAddress(value) if output_type == 'address' else value
+        for output_type, value in zip(
+            output_types,
+            decode_abi(output_types, HexBytes(data))
+        )
+    )
+
+
+def decode_call_result(output_types, data):
+    """ Decode function return data like ContractFunction.call() does, which
+    returns the bare value for a function with a single output.
+    """
+    values = decode_output(output_types, data)
+    return values[0] if len(values) == 1 else list(values)
+
+
+def is_method_not_found(error):
+    """ Whether the ValueError raised for a JSON-RPC error means the node
+    does not support the method, as opposed to the call failing
+    """
+    payload = error.args[0] if error.args else None
+
+    if not isinstance(payload, dict):
+        return False
+
+    message = str(payload.get('message', '')).lower()
+
+    return payload.get('code') == METHOD_NOT_FOUND or any(
+        text in message
+        for text in ('not supported', 'does not exist', 'not available')
+    )
+
+
+def batch_request(web3, calls, batch_size=BATCH_SIZE):
+    """ Send a list of (method, params) JSON-RPC calls as batch requests and
+    return the results in the same order.
+    """
+    results = []
+
+    for i in range(0, len(calls), batch_size):
+        payload = [
+            {'jsonrpc': '2.0', 'id': idx, 'method': method, 'params': params}
+            for idx, (method, params) in enumerate(calls[i:i + batch_size])
+        ]
+        response = get_session(web3.provider.endpoint_uri).post(
+            web3.provider.endpoint_uri,
+            json=payload,
+            **dict(web3.provider.get_request_kwargs())
+        )
+        response.raise_for_status()
+        responses = response.json()
+
+        # A rejected batch comes back as a single error object
+        if not isinstance(responses, list):
+            raise ValueError(responses)
+
+        if len(responses) != len(payload):
+            raise ValueError('Expected {} responses in batch, got {}'.format(
+                len(payload),
+                len(responses)
+            ))
+
+        for resp in sorted(responses, key=lambda r: r['id']):
+            if 'error' in resp:
+                raise ValueError(resp['error'])
+            results.append(resp['result'])
+
+    return results
+
+
+def format_receipt(receipt):
+    """ Format a raw JSON-RPC transaction receipt like
+    web3.eth.getTransactionReceipt() returns it
+    """
+    return AttributeDict.recursive(receipt_formatter(receipt))
+
+
+async def async_request(session, endpoint, method, params):
+    """ Send a single JSON-RPC call over an aiohttp session """
+    payload = {'jsonrpc': '2.0', 'id': 0, 'method': method, 'params': params}
+
+    async with session.post(endpoint, json=payload) as response:
+        response.raise_for_status()
+        resp = await response.json()
+
+    if 'error' in resp:
+        raise ValueError(resp['error'])
+
+    return resp['result']
+
+
+def concurrent_requests(web3, calls, max_concurrent=MAX_CONCURRENT_REQUESTS):
+    """ Send a list of (method, params) JSON-RPC calls concurrently over a
+    shared connection pool and return the results in the same order.
+    """
+    endpoint = web3.provider.endpoint_uri
+    # Same headers as the requests path, e.g. for endpoints that need auth
+    headers = dict(get_session(endpoint).headers)
+    headers.update(dict(web3.provider.get_request_kwargs()).get('headers', {}))
+
+    async def send_all():
+        # Only limit requests in flight here, waiting for a slot must not
+        # count against a request's timeout
+        slots = asyncio.Semaphore(max_concurrent)
+        connector = aiohttp.TCPConnector(limit=max_concurrent)
+
+        async with aiohttp.ClientSession(
+            connector=connector,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=None)
+        ) as session:
+            async def send(method, params):
+                async with slots:
+                    return await asyncio.wait_for(
+                        async_request(session, endpoint, method, params),
+                        HTTP_TIMEOUT
+                    )
+
+            return await asyncio.gather(*[
+                send(method, params) for method, params in calls
+            ])
+
+    return asyncio.run(send_all())
+
+
+def batch_call(web3, calls, block_number):
+    """ Call a list of (contract, fn_name, args) at the given block in a
+    single batch request.  Like ContractFunction.call(), a function with a
+    single output returns the bare value.
+    """
+    block_identifier = to_block_identifier(block_number)
+    output_types = [
+        get_output_types(contract, fn_name)
+        for contract, fn_name, _ in calls
+    ]
+    results = batch_request(web3, [
+        ('eth_call', [
+            {
+                'to': contract.address,
+                'data': contract.encodeABI(fn_name=fn_name, args=args),
+            },
+            block_identifier
+        ])
+        for contract, fn_name, args in calls
+    ])
+
+    return [
+        decode_call_result(types, result)
+        for types, result in zip(output_types, results)
+    ]
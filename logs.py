@@ -0,0 +1,61 @@
+""" Helpers for fetching event logs over large block ranges without running
+into provider eth_getLogs limits or timeouts.
+"""
+import requests
+from web3 import Web3
+
+# Block range to request at once, halved every time a request fails
+LOG_WINDOW_SIZE = 50000
+# Consecutive successful requests before growing the window again
+LOG_WINDOW_GROW_AFTER = 5
+# An indexed zero address, as it appears in a log topic
+ZERO_TOPIC = b'\x00' * 32
+
+
+def event_topic(signature):
+    """ topic0 for an event signature, e.g. Transfer(address,address,uint256) """
+    return Web3.keccak(text=signature).hex()
+
+
+def topic_to_address(topic):
+    """ Checksummed address from an indexed address topic """
+    return Web3.toChecksumAddress('0x' + topic.hex()[-40:])
+
+
+def get_logs_chunked(web3, address, topics, from_block, to_block,
+                     start_window=LOG_WINDOW_SIZE):
+    """ Get all logs for the given address and topics between from_block and
+    to_block (inclusive), walking the range in windows that shrink when the
+    node errors or times out and grow back when it recovers.
+    """
+    logs = []
+    window = start_window
+    successes = 0
+    lo = from_block
+
+    while lo <= to_block:
+        hi = min(lo + window - 1, to_block)
+
+        try:
+            logs.extend(web3.eth.getLogs({
+                'address': address,
+                'topics': topics,
+                'fromBlock': lo,
+                'toBlock': hi,
+            }))
+        except (ValueError, requests.exceptions.RequestException):
+            # Nothing left to shrink, the node just isn't having it
+            if window == 1:
+                raise
+            window = max(window // 2, 1)
+            successes = 0
+            continue
+
+        lo = hi + 1
+        successes += 1
+
+        if successes >= LOG_WINDOW_GROW_AFTER and window < start_window:
+            window = min(window * 2, start_window)
+            successes = 0
+
+    return logs
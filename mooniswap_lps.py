@@ -5,39 +5,26 @@ CSV format out:
 token0,token1,lp_address,lp_balance,approx_token0,approx_token1
 """
 import sys
-import json
-from decimal import Decimal
-from math import floor
-from pathlib import Path
+import csv
 from argparse import ArgumentParser
 from web3 import Web3
+from logs import ZERO_TOPIC, event_topic, topic_to_address
+from event_cache import get_events_cached
+from multicall import multicall_balance_of, multicall_functions
+from abi_cache import load_abi
 
-ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 OUSD_ADDRESS = "0x2A8e1E676Ec238d8A992307B495b45B3fEAa5e86"
 
-ME = Path(__file__).resolve()
-OUSD_ABI = json.load(
-    ME.parent.joinpath('metadata/OUSD.json').open()
-).get('abi')
-MOONISWAP_ABI = json.load(
-    ME.parent.joinpath('metadata/Mooniswap.json').open()
-).get('abi')
-IERC20_ABI = json.load(
-    ME.parent.joinpath('metadata/IERC20.json').open()
-).get('abi')
+OUSD_ABI = load_abi('OUSD')
+MOONISWAP_ABI = load_abi('Mooniswap')
+IERC20_ABI = load_abi('IERC20')
 
 MINIMUM_LIQUIDITY = 1000
 MAX_ROUNDING_DRIFT = 10
+WAD = 10**18
 
-
-def dict_get(d, path):
-    pparts = path.split('.')
-    lp = len(pparts)
-    if lp < 1:
-        return None
-    elif lp > 1:
-        return dict_get(d.get(pparts[0]), '.'.join(pparts[1:]))
-    return d.get(path)
+DEPOSITED_TOPIC = event_topic('Deposited(address,uint256)')
+TRANSFER_TOPIC = event_topic('Transfer(address,address,uint256)')
 
 
 def parse_args(argv):
@@ -55,11 +42,8 @@ def parse_args(argv):
 
 
 def ousd_value_adjustment(token_balance, from_cpt, to_cpt):
-    token_balance = Decimal(token_balance)
-    from_cpt = Decimal(from_cpt)
-    to_cpt = Decimal(to_cpt)
-    credits = floor(token_balance * from_cpt / Decimal(1e18))
-    return floor(credits * Decimal(1e18) / to_cpt)
+    credits = token_balance * from_cpt // WAD
+    return credits * WAD // to_cpt
 
 
 def main():
@@ -67,81 +51,89 @@ def main():
     web3 = Web3(Web3.HTTPProvider(args.endpoint))
 
     block_number = int(args.block)
-    addresses_of_interest = []
+    # Insertion ordered set so the CSV output order is stable
+    addresses_of_interest = {}
 
     mooniswap = web3.eth.contract(
         address=Web3.toChecksumAddress(args.address),
         abi=MOONISWAP_ABI
     )
 
-    a = mooniswap.functions.tokens(0).call(block_identifier=block_number)
-    b = mooniswap.functions.tokens(1).call(block_identifier=block_number)
+    [a, b, total_supply] = multicall_functions(web3, [
+        (mooniswap, 'tokens', [0]),
+        (mooniswap, 'tokens', [1]),
+        (mooniswap, 'totalSupply', []),
+    ], block_number)
 
     token_a = web3.eth.contract(address=a, abi=IERC20_ABI)
     token_b = web3.eth.contract(address=b, abi=IERC20_ABI)
 
+    setup_calls = [
+        (token_a, 'balanceOf', [mooniswap.address]),
+        (token_b, 'balanceOf', [mooniswap.address]),
+    ]
+
     ousd = None
     current_cpt = None
     to_cpt = None
     if a == OUSD_ADDRESS or b == OUSD_ADDRESS:
         ousd = web3.eth.contract(address=OUSD_ADDRESS, abi=OUSD_ABI)
-
-        current_cpt = int(ousd.functions.rebasingCreditsPerToken().call(
-            block_identifier=block_number
-        ), 16)
+        setup_calls.append((ousd, 'rebasingCreditsPerToken', []))
 
         if args.credits_per_token:
             to_cpt = int(args.credits_per_token)
 
-    total_supply = mooniswap.functions.totalSupply().call(
-        block_identifier=block_number
-    )
-    a_supply = token_a.functions.balanceOf(mooniswap.address).call(
-        block_identifier=block_number
-    )
-    b_supply = token_b.functions.balanceOf(mooniswap.address).call(
-        block_identifier=block_number
-    )
-
-    deposits_filter = mooniswap.events.Deposited.createFilter(
-        fromBlock=0,
-        toBlock=block_number
-    )
-    deposits = deposits_filter.get_all_entries()
-
-    for deposit in deposits:
-        account = dict_get(deposit, 'args.account')
-
-        if account and account not in addresses_of_interest:
-            addresses_of_interest.append(account)
-
-    transfers_filter = mooniswap.events.Transfer.createFilter(fromBlock=0, toBlock=block_number)
-    transfers = transfers_filter.get_all_entries()
-
-    for transfer in transfers:
-        account = dict_get(transfer, 'args.to')
-
-        if account and account not in addresses_of_interest:
-            addresses_of_interest.append(account)
+    setup_results = multicall_functions(web3, setup_calls, block_number)
+    [a_supply, b_supply] = setup_results[:2]
+
+    if ousd:
+        current_cpt = int(setup_results[2], 16)
+
+    # Deposited(address indexed account, uint256 amount)
+    for log in get_events_cached(
+        web3,
+        mooniswap.address,
+        [DEPOSITED_TOPIC],
+        0,
+        block_number
+    ):
+        addresses_of_interest[topic_to_address(log['topics'][1])] = None
+
+    # Only the recipient is needed, so read it straight from the indexed topic
+    for log in get_events_cached(
+        web3,
+        mooniswap.address,
+        [TRANSFER_TOPIC],
+        0,
+        block_number
+    ):
+        to_topic = log['topics'][2]
+
+        if to_topic != ZERO_TOPIC:
+            addresses_of_interest[topic_to_address(to_topic)] = None
 
     # Now that we have all the theoretical players, get their balance as of the block
     running_total = 0
     running_total_a = 0
     running_total_b = 0
-    for addr in addresses_of_interest:
+    # Each holder's share is floored, losing up to a wei per token
+    holders = 0
+    lp_balances = multicall_balance_of(
+        web3,
+        mooniswap,
+        addresses_of_interest,
+        block_number
+    )
 
-        lp_balance = mooniswap.functions.balanceOf(addr).call(
-            block_identifier=block_number
-        )
+    writer = csv.writer(sys.stdout, lineterminator='\n')
 
+    for addr, lp_balance in zip(addresses_of_interest, lp_balances):
         a_balance = 0
         b_balance = 0
         if lp_balance != 0:
-            ratio = Decimal(lp_balance) / Decimal(total_supply)
-            #a_balance = floor(a_supply * ratio)
-            #b_balance = floor(b_supply * ratio)
-            a_balance = a_supply * ratio
-            b_balance = b_supply * ratio
+            a_balance = a_supply * lp_balance // total_supply
+            b_balance = b_supply * lp_balance // total_supply
+            holders += 1
 
         running_total += lp_balance
         running_total_a += a_balance
@@ -161,13 +153,13 @@ def main():
                     to_cpt
                 )
 
-        print('{},{},{},{},{},{}'.format(
+        writer.writerow((
             a,
             b,
             addr,
             lp_balance,
-            floor(a_balance),
-            floor(b_balance)
+            a_balance,
+            b_balance
         ))
 
     """ To ameliorate rounding errors and increase the theoretical minimum
@@ -177,14 +169,16 @@ def main():
     provision, after which point the totalSupply is forevermore bounded.
     """
     # This just verifies we know about all funds
-    if abs(a_supply - running_total_a) > MAX_ROUNDING_DRIFT:
+    max_drift = MAX_ROUNDING_DRIFT + holders
+
+    if abs(a_supply - running_total_a) > max_drift:
         print('!!!!!!!!!!!!!!!!!!!!!! {} != {} (token0 supply) !!!!!!!'.format(
             running_total_a,
             a_supply
         ), file=sys.stderr)
         sys.exit(1)
 
-    if abs(b_supply - running_total_b) > MAX_ROUNDING_DRIFT:
+    if abs(b_supply - running_total_b) > max_drift:
         print('!!!!!!!!!!!!!!!!!!!!!! {} != {} (token1 supply) !!!!!!!'.format(
             b_supply,
             running_total_b
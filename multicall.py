@@ -0,0 +1,113 @@
+""" Helpers for batching many contract reads into a single eth_call using the
+MakerDAO Multicall contract.
+
+Multicall (v1) was deployed at block 7929876, well before the blocks we query.
+The newer Multicall2 and Multicall3 deployments did not exist yet at the time
+of the hack, so they can not be used for historical calls here.
+"""
+from eth_abi import encode_abi
+from eth_utils import function_abi_to_4byte_selector
+from jsonrpc import (
+    concurrent_requests,
+    decode_call_result,
+    decode_output,
+    get_output_types,
+    to_block_identifier,
+)
+from abi_cache import load_abi
+
+MULTICALL_ADDRESS = "0xeefBa1e63905eF1D7ACbA5a8513c70307C1cE441"
+MULTICALL_ABI = load_abi('Multicall')
+
+# Keep each eth_call well under node gas caps and response size limits
+MULTICALL_BATCH_SIZE = 500
+# keccak('balanceOf(address)')[:4]
+BALANCE_OF_SELECTOR = '0x70a08231'
+
+
+def aggregate(web3, calls, block_number, batch_size=MULTICALL_BATCH_SIZE):
+    """ Execute a list of (target, call_data) tuples at the given block and
+    return the raw return data of each, in order.  Batches are sent
+    concurrently.
+    """
+    multicall = web3.eth.contract(address=MULTICALL_ADDRESS, abi=MULTICALL_ABI)
+    output_types = get_output_types(multicall, 'aggregate')
+    block_identifier = to_block_identifier(block_number)
+    results = concurrent_requests(web3, [
+        ('eth_call', [
+            {
+                'to': multicall.address,
+                'data': multicall.encodeABI(
+                    fn_name='aggregate',
+                    args=[calls[i:i + batch_size]]
+                ),
+            },
+            block_identifier
+        ])
+        for i in range(0, len(calls), batch_size)
+    ])
+
+    return [
+        data
+        for result in results
+        for data in decode_output(output_types, result)[1]
+    ]
+
+
+def multicall(web3, contract, fn_name, args_list, block_number):
+    """ Call `contract.fn_name(*args)` for every args in args_list and return
+    a list of the decoded outputs (as tuples), in order.
+    """
+    # Resolve the function once instead of through web3.py for every call
+    fn_abi = contract.get_function_by_name(fn_name).abi
+    selector = function_abi_to_4byte_selector(fn_abi)
+    input_types = [arg['type'] for arg in fn_abi['inputs']]
+    output_types = [output['type'] for output in fn_abi['outputs']]
+    calls = [
+        (contract.address, selector + encode_abi(input_types, args))
+        for args in args_list
+    ]
+
+    return [
+        decode_output(output_types, data)
+        for data in aggregate(web3, calls, block_number)
+    ]
+
+
+def balance_of_call_data(address):
+    """ balanceOf(address) calldata, encoded by hand for hot loops """
+    return BALANCE_OF_SELECTOR + address[2:].lower().rjust(64, '0')
+
+
+def multicall_balance_of(web3, token_contract, addresses, block_number):
+    """ Get the balanceOf() for each of the given addresses """
+    return [
+        int.from_bytes(data, 'big') for data in aggregate(
+            web3,
+            [
+                (token_contract.address, balance_of_call_data(addr))
+                for addr in addresses
+            ],
+            block_number
+        )
+    ]
+
+
+def multicall_functions(web3, calls, block_number):
+    """ Call a list of (contract, fn_name, args) at the given block in a
+    single multicall.  Like ContractFunction.call(), a function with a single
+    output returns the bare value.
+    """
+    output_types = [
+        get_output_types(contract, fn_name)
+        for contract, fn_name, _ in calls
+    ]
+    return_data = aggregate(web3, [
+        (contract.address, contract.encodeABI(fn_name=fn_name, args=args))
+        for contract, fn_name, args in calls
+    ], block_number)
+
+    return [
+        decode_call_result(types, data)
+        for types, data in zip(output_types, return_data)
+    ]
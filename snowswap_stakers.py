@@ -5,40 +5,26 @@ CSV format out:
 staker_address, credit_balance, ousd_balance, ratioed_ousd_balance
 """
 import sys
-import json
+import csv
 from decimal import Decimal
-from math import floor
-from pathlib import Path
 from argparse import ArgumentParser
 from web3 import Web3
+from logs import event_topic, topic_to_address
+from event_cache import get_events_cached
+from multicall import multicall_balance_of, multicall_functions
+from abi_cache import load_abi
 
-ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 OUSD_ADDRESS = "0x2A8e1E676Ec238d8A992307B495b45B3fEAa5e86"
 SNOWSWAP_GEYSER_ADDRESS = "0x7c2Fa8c30DB09e8B3c147Ac67947829447BF07bD"
 
-ME = Path(__file__).resolve()
-SNOWSWAP_STAKING_ABI = json.load(
-    ME.parent.joinpath('metadata/SnowswapStakingRewards.json').open()
-).get('abi')
-OUSD_ABI = json.load(
-    ME.parent.joinpath('metadata/OUSD.json').open()
-).get('abi')
-IERC20_ABI = json.load(
-    ME.parent.joinpath('metadata/IERC20.json').open()
-).get('abi')
+SNOWSWAP_STAKING_ABI = load_abi('SnowswapStakingRewards')
+OUSD_ABI = load_abi('OUSD')
 
 MAX_ROUNDING_DRIFT = 1e8
 MAX_CREDIT_DRIFT = 50
+WAD = 10**18
 
-
-def dict_get(d, path):
-    pparts = path.split('.')
-    lp = len(pparts)
-    if lp < 1:
-        return None
-    elif lp > 1:
-        return dict_get(d.get(pparts[0]), '.'.join(pparts[1:]))
-    return d.get(path)
+STAKED_TOPIC = event_topic('Staked(address,uint256)')
 
 
 def parse_args(argv):
@@ -56,11 +42,8 @@ def parse_args(argv):
 
 
 def ousd_value_adjustment(token_balance, from_cpt, to_cpt):
-    token_balance = Decimal(token_balance)
-    from_cpt = Decimal(from_cpt)
-    to_cpt = Decimal(to_cpt)
-    credits = floor(token_balance * from_cpt / Decimal(1e18))
-    return floor(credits * Decimal(1e18) / to_cpt)
+    credits = token_balance * from_cpt // WAD
+    return credits * WAD // to_cpt
 
 
 def main():
@@ -69,7 +52,8 @@ def main():
 
     token_address = Web3.toChecksumAddress(args.address)
     block_number = int(args.block)
-    addresses_of_interest = []
+    # Insertion ordered set so the CSV output order is stable
+    addresses_of_interest = {}
 
     ousd = web3.eth.contract(address=token_address, abi=OUSD_ABI)
     snowswap_geyser = web3.eth.contract(
@@ -77,29 +61,30 @@ def main():
         abi=SNOWSWAP_STAKING_ABI
     )
 
+    [
+        raw_cpt,
+        total_supply,
+        known_balance,
+        known_credit_balance
+    ] = multicall_functions(web3, [
+        (ousd, 'rebasingCreditsPerToken', []),
+        (snowswap_geyser, 'totalSupply', []),
+        (ousd, 'balanceOf', [snowswap_geyser.address]),
+        (ousd, 'creditsBalanceOf', [snowswap_geyser.address]),
+    ], block_number)
+
     # Snowswap does internal accounting on credits for whatever reason
-    current_cpt = int(ousd.functions.rebasingCreditsPerToken().call(
-        block_identifier=block_number
-    ), 16)
+    current_cpt = int(raw_cpt, 16)
     credits_per_token = current_cpt
     if args.credits_per_token:
         credits_per_token = int(args.credits_per_token)
 
-    total_supply = snowswap_geyser.functions.totalSupply().call(
-        block_identifier=block_number
-    )
-    known_balance = ousd.functions.balanceOf(snowswap_geyser.address).call(
-        block_identifier=block_number
-    )
     if args.credits_per_token:
         known_balance = ousd_value_adjustment(
             known_balance,
             current_cpt,
             credits_per_token
         )
-    known_credit_balance = ousd.functions.creditsBalanceOf(
-        snowswap_geyser.address
-    ).call(block_identifier=block_number)
 
     # The tiny drift here is from internal contract math leaving behind tiny
     # fractions of an indivisible unit
@@ -109,43 +94,46 @@ def main():
             known_credit_balance
         )
 
-    stakes_filter = snowswap_geyser.events.Staked.createFilter(
-        fromBlock=0,
-        toBlock=block_number
-    )
-    stakes = stakes_filter.get_all_entries()
-
-    for stake in stakes:
-        account = dict_get(stake, 'args.user')
-        if account and account not in addresses_of_interest:
-            addresses_of_interest.append(account)
+    # Staked(address indexed user, uint256 amount)
+    for log in get_events_cached(
+        web3,
+        snowswap_geyser.address,
+        [STAKED_TOPIC],
+        0,
+        block_number
+    ):
+        addresses_of_interest[topic_to_address(log['topics'][1])] = None
 
     # Now that we have all the theoretical players, get their balance as of the block
     running_total = 0
     usd_running_total = 0
     ousd_running_total = 0
     ratioed_ousd_running_total = 0
+    credit_balances = multicall_balance_of(
+        web3,
+        snowswap_geyser,
+        addresses_of_interest,
+        block_number
+    )
 
-    for addr in addresses_of_interest:
+    writer = csv.writer(sys.stdout, lineterminator='\n')
+
+    for addr, credit_balance in zip(addresses_of_interest, credit_balances):
         usd_balance = 0
         ousd_balance = 0
         ratioed_ousd_balance = 0
-        credit_balance = snowswap_geyser.functions.balanceOf(addr).call(
-            block_identifier=block_number
-        )
 
         if credit_balance != 0:
-            ousd_balance = floor(credit_balance  * 1e18 / credits_per_token)
-            usd_balance = Decimal(ousd_balance) / Decimal(1e18)
-            ratio = Decimal(credit_balance / total_supply)
-            ratioed_ousd_balance = floor(known_balance * ratio)
+            ousd_balance = credit_balance * WAD // credits_per_token
+            usd_balance = Decimal(ousd_balance) / Decimal(WAD)
+            ratioed_ousd_balance = known_balance * credit_balance // total_supply
 
         running_total += credit_balance
         ousd_running_total += ousd_balance
         usd_running_total += usd_balance
         ratioed_ousd_running_total += ratioed_ousd_balance
 
-        print('{},{},{},{}'.format(
+        writer.writerow((
             addr,
             credit_balance,
             ousd_balance,
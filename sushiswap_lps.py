@@ -5,49 +5,42 @@ CSV format out:
 token0,token1,lp_address,lp_balance,approx_token0,approx_token1
 """
 import sys
-import json
-from decimal import Decimal
-from math import floor
-from pathlib import Path
+import csv
 from argparse import ArgumentParser
 from web3 import Web3
+from jsonrpc import batch_call, batch_request
+from logs import ZERO_TOPIC, event_topic, topic_to_address
+from event_cache import get_events_cached
+from multicall import MULTICALL_BATCH_SIZE, multicall, multicall_balance_of
+from abi_cache import load_abi
 
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 FACTORY_ADDRESS = "0xC0AEe478e3658e2610c5F7A4A2E1777cE9e4f2Ac"
 MASTER_CHEF_ADDRESS = "0xc2EdaD668740f1aA35E4D8f227fB8E17dcA888Cd"
 OUSD_ADDRESS = "0x2A8e1E676Ec238d8A992307B495b45B3fEAa5e86"
 
-ME = Path(__file__).resolve()
-OUSD_ABI = json.load(
-    ME.parent.joinpath('metadata/OUSD.json').open()
-).get('abi')
-FACTORY_ABI = json.load(
-    ME.parent.joinpath('metadata/SushiSwapV2Factory.json').open()
-).get('abi')
-PAIR_ABI = json.load(
-    ME.parent.joinpath('metadata/SushiSwapV2Pair.json').open()
-).get('abi')
-MASTER_CHEF_ABI = json.load(
-    ME.parent.joinpath('metadata/MasterChef.json').open()
-).get('abi')
+OUSD_ABI = load_abi('OUSD')
+FACTORY_ABI = load_abi('SushiSwapV2Factory')
+PAIR_ABI = load_abi('SushiSwapV2Pair')
+MASTER_CHEF_ABI = load_abi('MasterChef')
 
 MINIMUM_LIQUIDITY = 1000
 MAX_ROUNDING_DRIFT = 10
+WAD = 10**18
 
 ADD_LIQUDITY_SIG = "0xe8e33700"
 ADD_LIQUDITY_ETH_SIG = "0xf305d719"
 # Zapper.fi mints on sushiswap pairs?
 ZAP_IN_ETH_SIG = "0x1d572320"
+KNOWN_ADD_SIGS = frozenset({
+    ADD_LIQUDITY_SIG,
+    ADD_LIQUDITY_ETH_SIG,
+    ZAP_IN_ETH_SIG,
+})
 
-
-def dict_get(d, path):
-    pparts = path.split('.')
-    lp = len(pparts)
-    if lp < 1:
-        return None
-    elif lp > 1:
-        return dict_get(d.get(pparts[0]), '.'.join(pparts[1:]))
-    return d.get(path)
+MINT_TOPIC = event_topic('Mint(address,uint256,uint256)')
+TRANSFER_TOPIC = event_topic('Transfer(address,address,uint256)')
+DEPOSIT_TOPIC = event_topic('Deposit(address,uint256,uint256)')
 
 
 def parse_args(argv):
@@ -67,11 +60,8 @@ def parse_args(argv):
 
 
 def ousd_value_adjustment(token_balance, from_cpt, to_cpt):
-    token_balance = Decimal(token_balance)
-    from_cpt = Decimal(from_cpt)
-    to_cpt = Decimal(to_cpt)
-    credits = floor(token_balance * from_cpt / Decimal(1e18))
-    return floor(credits * Decimal(1e18) / to_cpt)
+    credits = token_balance * from_cpt // WAD
+    return credits * WAD // to_cpt
 
 
 def main():
@@ -95,35 +85,57 @@ def main():
         print('Unable to find pair {}-{}'.format(a, b), file=sys.stderr)
         sys.exit(1)
 
+    pair = web3.eth.contract(address=pair_address, abi=PAIR_ABI)
+
+    setup_calls = [
+        (master_chef, 'poolLength', []),
+        (pair, 'totalSupply', []),
+        (pair, 'getReserves', []),
+    ]
+
     ousd = None
     current_cpt = None
     to_cpt = None
 
     if a == OUSD_ADDRESS or b == OUSD_ADDRESS:
         ousd = web3.eth.contract(address=OUSD_ADDRESS, abi=OUSD_ABI)
-
-        current_cpt = int(ousd.functions.rebasingCreditsPerToken().call(
-            block_identifier=block_number
-        ), 16)
+        setup_calls.append((ousd, 'rebasingCreditsPerToken', []))
 
         if args.credits_per_token:
             to_cpt = int(args.credits_per_token)
 
-    pair = web3.eth.contract(address=pair_address, abi=PAIR_ABI)
+    setup_results = batch_call(web3, setup_calls, block_number)
+    [
+        pool_length,
+        total_supply,
+        [a_supply, b_supply, blockstamp]
+    ] = setup_results[:3]
+
+    if ousd:
+        current_cpt = int(setup_results[3], 16)
 
     # We're looking for the pool ID (aka pid) to use for later lookups
     pair_pool_id = -1
-    pool_length = master_chef.functions.poolLength().call(
-        block_identifier=block_number
-    )
 
-    for pid in reversed(range(0, pool_length-1)):
-        pool_info = master_chef.functions.poolInfo(pid).call(
-            block_identifier=block_number
+    # Newer pools are more likely, so sweep from the end in multicall batches
+    pids = list(reversed(range(0, pool_length-1)))
+
+    for i in range(0, len(pids), MULTICALL_BATCH_SIZE):
+        batch_pids = pids[i:i + MULTICALL_BATCH_SIZE]
+        pool_infos = multicall(
+            web3,
+            master_chef,
+            'poolInfo',
+            [[pid] for pid in batch_pids],
+            block_number
         )
 
-        if pool_info and pool_info[0] == pair.address:
-            pair_pool_id = pid
+        for pid, pool_info in zip(batch_pids, pool_infos):
+            if pool_info[0] == pair.address:
+                pair_pool_id = pid
+                break
+
+        if pair_pool_id >= 0:
             break
 
     if pair_pool_id < 0:
@@ -132,61 +144,78 @@ def main():
         ), file=sys.stderr)
         sys.exit(1)
 
-    total_supply = pair.functions.totalSupply().call(
-        block_identifier=block_number
-    )
-    [a_supply, b_supply, blockstamp] = pair.functions.getReserves().call(
-        block_identifier=block_number
-    )
-
-    addresses_of_interest = []
+    # Insertion ordered set so the CSV output order is stable
+    addresses_of_interest = {}
 
-    mints_filter = pair.events.Mint.createFilter(
-        fromBlock=0,
-        toBlock=block_number
+    mints = get_events_cached(
+        web3,
+        pair.address,
+        [MINT_TOPIC],
+        0,
+        block_number
     )
-    mints = mints_filter.get_all_entries()
 
-    for mint in mints:
-        mint_txhash = mint['transactionHash'].hex()
-        minter = dict_get(mint, 'args.sender')
+    # Need the TXs because the Mint event doesn't have the tx origin.  A single
+    # TX can emit several Mints, so only fetch each one once.
+    mint_txhashes = list(dict.fromkeys(
+        mint['transactionHash'].hex() for mint in mints
+    ))
+    # Only the selector and sender are used, so don't hold on to the calldata
+    tx_origins = {
+        txhash: (tx['input'][:10], tx.get('from'))
+        for txhash, tx in zip(mint_txhashes, batch_request(web3, [
+            ('eth_getTransactionByHash', [txhash]) for txhash in mint_txhashes
+        ]))
+    }
 
-        # Need to get the TX because the Mint event doesn't have the tx origin
-        tx = web3.eth.getTransaction(mint_txhash)
+    for mint in mints:
+        [selector, tx_from] = tx_origins[mint['transactionHash'].hex()]
 
         # Check is just to validate assumptions and prevent unexpected errors
-        if not (
-            tx.get('input').startswith(ADD_LIQUDITY_SIG)
-            or tx.get('input').startswith(ADD_LIQUDITY_ETH_SIG)
-            or tx.get('input').startswith(ZAP_IN_ETH_SIG)
-        ):
-            print('UNKNOWN FUNCTION RESULTING IN EVENT:', tx['input'])
+        if selector not in KNOWN_ADD_SIGS:
+            print('UNKNOWN FUNCTION RESULTING IN EVENT:', selector)
             sys.exit(1)
         else:
-            lp_addr = tx.get('from', minter)
+            # Mint(address indexed sender, uint256 amount0, uint256 amount1)
+            lp_addr = Web3.toChecksumAddress(
+                tx_from or topic_to_address(mint['topics'][1])
+            )
 
             # minter is probably always the V2 router
-            if (
-                lp_addr != ZERO_ADDRESS
-                and lp_addr not in addresses_of_interest
-            ):
-                addresses_of_interest.append(lp_addr)
+            if lp_addr != ZERO_ADDRESS:
+                addresses_of_interest[lp_addr] = None
 
     # In additon to mints, transfers of LP tokens can happen
-    transfers_filter = pair.events.Transfer.createFilter(
-        fromBlock=0,
-        toBlock=block_number
+    # Only the recipient is needed, so read it straight from the indexed topic
+    for log in get_events_cached(
+        web3,
+        pair.address,
+        [TRANSFER_TOPIC],
+        0,
+        block_number
+    ):
+        to_topic = log['topics'][2]
+
+        if to_topic != ZERO_TOPIC:
+            addresses_of_interest[topic_to_address(to_topic)] = None
+
+    # Only accounts that have deposited into the pair's pool can have LP tokens
+    # staked in MasterChef.
+    # Deposit(address indexed user, uint256 indexed pid, uint256 amount)
+    chef_depositors = dict.fromkeys(
+        topic_to_address(log['topics'][1]) for log in get_events_cached(
+            web3,
+            master_chef.address,
+            [
+                DEPOSIT_TOPIC,
+                None,
+                '0x' + pair_pool_id.to_bytes(32, 'big').hex()
+            ],
+            0,
+            block_number
+        )
     )
-    transfers = transfers_filter.get_all_entries()
-
-    for transfer in transfers:
-        to_address = dict_get(transfer, 'args.to')
-
-        if (
-            to_address != ZERO_ADDRESS
-            and to_address not in addresses_of_interest
-        ):
-            addresses_of_interest.append(to_address)
+    addresses_of_interest.update(chef_depositors)
 
     # Now that we have all the theoretical players, get their balance as of the block
     master_chef_total = 0
@@ -194,24 +223,38 @@ def main():
     running_total_no_chef = 0
     running_total_a = 0
     running_total_b = 0
+    # Each holder's share is floored, losing up to a wei per token
+    holders = 0
+    lp_supply = total_supply - MINIMUM_LIQUIDITY
+    lp_balances = multicall_balance_of(
+        web3,
+        pair,
+        addresses_of_interest,
+        block_number
+    )
+    chef_stakers = [
+        addr for addr in addresses_of_interest if addr in chef_depositors
+    ]
+    chef_lp_balances = {
+        addr: amount for addr, (amount, _) in zip(chef_stakers, multicall(
+            web3,
+            master_chef,
+            'userInfo',
+            [[pair_pool_id, addr] for addr in chef_stakers],
+            block_number
+        ))
+    }
 
-    for addr in addresses_of_interest:
-
-        lp_balance = pair.functions.balanceOf(addr).call(
-            block_identifier=block_number
-        )
+    writer = csv.writer(sys.stdout, lineterminator='\n')
 
+    for addr, lp_balance in zip(addresses_of_interest, lp_balances):
         # Skip MasterChef because its balance is actually others'
         if addr == master_chef.address:
-            ratio = Decimal(lp_balance) / Decimal(total_supply - MINIMUM_LIQUIDITY)
             master_chef_total = lp_balance
             continue
 
         # Get a user's balance data for their ratio of the pool
-        chef_user_info = master_chef.functions.userInfo(pair_pool_id, addr).call(
-            block_identifier=block_number
-        )
-        chef_lp_balance = chef_user_info[0]
+        chef_lp_balance = chef_lp_balances.get(addr, 0)
         combined_lp_balance = lp_balance + chef_lp_balance
 
         a_balance = 0
@@ -219,13 +262,9 @@ def main():
 
         # Figure out their ratio of ownership of the pool
         if combined_lp_balance != 0:
-            ratio = Decimal(combined_lp_balance) / Decimal(
-                total_supply - MINIMUM_LIQUIDITY
-            )
-            #a_balance = floor(a_supply * ratio)
-            #b_balance = floor(b_supply * ratio)
-            a_balance = a_supply * ratio
-            b_balance = b_supply * ratio
+            a_balance = a_supply * combined_lp_balance // lp_supply
+            b_balance = b_supply * combined_lp_balance // lp_supply
+            holders += 1
 
         running_total += combined_lp_balance
         running_total_no_chef += lp_balance
@@ -246,13 +285,13 @@ def main():
                     to_cpt
                 )
 
-        print('{},{},{},{},{},{}'.format(
+        writer.writerow((
             a,
             b,
             addr,
             combined_lp_balance,
-            floor(a_balance),
-            floor(b_balance)
+            a_balance,
+            b_balance
         ))
 
     """ To ameliorate rounding errors and increase the theoretical minimum
@@ -276,14 +315,16 @@ def main():
         ))
         sys.exit(1)
 
-    if a_supply - running_total_a > MAX_ROUNDING_DRIFT:
+    max_drift = MAX_ROUNDING_DRIFT + holders
+
+    if a_supply - running_total_a > max_drift:
         print('!!!!!!!!!!!!!!!!!!!!!! {} != {} (token0 supply) !!!!!!!'.format(
             running_total_a,
             a_supply
         ))
         sys.exit(1)
 
-    if b_supply - running_total_b > MAX_ROUNDING_DRIFT:
+    if b_supply - running_total_b > max_drift:
         print('!!!!!!!!!!!!!!!!!!!!!! {} != {} (token1 supply) !!!!!!!'.format(
             running_total_b,
             b_supply
@@ -0,0 +1,97 @@
+""" Tests for the JSON-RPC helpers against a local mock node.
+
+Run with: python -m unittest test_jsonrpc
+"""
+import json
+import time
+import asyncio
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from web3 import Web3
+import jsonrpc
+
+
+class SlowNodeHandler(BaseHTTPRequestHandler):
+    """ Answers every call with its method name after `delay` seconds """
+    delay = 0
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(
+            int(self.headers['Content-Length'])
+        ))
+        time.sleep(self.delay)
+        body = json.dumps({
+            'jsonrpc': '2.0',
+            'id': request['id'],
+            'result': request['method'],
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ConcurrentRequestsTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), SlowNodeHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.web3 = Web3(Web3.HTTPProvider(
+            'http://127.0.0.1:{}'.format(self.server.server_port)
+        ))
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_drains_more_calls_than_fit_in_one_timeout(self):
+        """ 40 calls of 0.2s with 4 in flight take ~2s, well past the 0.5s
+        timeout, but no single request is slow
+        """
+        SlowNodeHandler.delay = 0.2
+        calls = [('method_{}'.format(i), []) for i in range(40)]
+
+        with mock.patch.object(jsonrpc, 'HTTP_TIMEOUT', 0.5):
+            results = jsonrpc.concurrent_requests(
+                self.web3,
+                calls,
+                max_concurrent=4
+            )
+
+        self.assertEqual(results, [method for method, _ in calls])
+
+    def test_slow_request_times_out(self):
+        SlowNodeHandler.delay = 1
+
+        with mock.patch.object(jsonrpc, 'HTTP_TIMEOUT', 0.2):
+            with self.assertRaises(asyncio.TimeoutError):
+                jsonrpc.concurrent_requests(self.web3, [('slow', [])])
+
+
+class IsMethodNotFoundTest(unittest.TestCase):
+    def test_method_not_found(self):
+        self.assertTrue(jsonrpc.is_method_not_found(ValueError({
+            'code': -32601,
+            'message': 'the method eth_getBlockReceipts does not exist',
+        })))
+        self.assertTrue(jsonrpc.is_method_not_found(ValueError({
+            'code': -32000,
+            'message': 'Method not supported',
+        })))
+
+    def test_other_errors(self):
+        self.assertFalse(jsonrpc.is_method_not_found(ValueError({
+            'code': -32000,
+            'message': 'header not found',
+        })))
+        self.assertFalse(jsonrpc.is_method_not_found(ValueError('oops')))
+
+
+if __name__ == "__main__":
+    unittest.main()
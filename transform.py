@@ -3,23 +3,29 @@ Script to calculate OUSD hack compensation values.
 """
 import sys
 import csv
-import locale
-from math import floor
+import hashlib
+import pickle
 from enum import Enum
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 from decimal import Decimal
 from argparse import ArgumentParser
 from web3 import Web3
 
-locale.setlocale(locale.LC_ALL, '')
 ME = Path(__file__).resolve()
 VIRGOX_PROCEEDS = ME.parent.joinpath('metadata', 'virgox_proceeds.csv')
+ACCOUNTS_CACHE_DIR = ME.parent.joinpath('cache', 'accounts')
 
 OUSD_ADDRESS = "0x2A8e1E676Ec238d8A992307B495b45B3fEAa5e86"
 WETH_ADDRESS = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
 USDT_ADDRESS = "0xdAC17F958D2ee523a2206206994597C13D831ec7"
 USDC_ADDRESS = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
 
+WAD = 10**18
+# USDT and USDC have 6 decimals, scale them up to 18
+_USD6_TO_18 = 10**12
+
 
 class Direction(Enum):
     """ Direction of the trade.  OUSD is always on the left, so
@@ -29,7 +35,50 @@ class Direction(Enum):
     RIGHT = 1
 
 
+# Swap directions are stored as plain ints
+LEFT = Direction.LEFT.value
+RIGHT = Direction.RIGHT.value
+
+
+# Balances held by an Account.  LP balances, USDC and USDT have only 6
+# decimals!
+BALANCE_FIELDS = (
+    'ousd_balance_start',
+    'ousd_balance_end',
+    'usdt_balance_start',
+    'usdt_balance_end',
+    'usdc_balance_start',
+    'usdc_balance_end',
+    'weth_balance_start',
+    'weth_balance_end',
+    'ousd_lp_start',
+    'ousd_lp_end',
+    'usdt_lp_start',
+    'usdt_lp_end',
+    'usdc_lp_start',
+    'usdc_lp_end',
+    'weth_lp_start',
+    'weth_lp_end',
+)
+FIELD_INDEX = {name: i for i, name in enumerate(BALANCE_FIELDS)}
+OUSD_BALANCE_START = FIELD_INDEX['ousd_balance_start']
+OUSD_BALANCE_END = FIELD_INDEX['ousd_balance_end']
+OUSD_LP_START = FIELD_INDEX['ousd_lp_start']
+
+
 class CalcParameters:
+    __slots__ = (
+        'split_threshold',
+        'ousd_ogn_split',
+        'ogn_price_usd',
+        'eth_value_usd',
+        'minimum_threshold',
+        'split_threshold_wei',
+        'ousd_ogn_split_num',
+        'ousd_ogn_split_den',
+        'ogn_price_wei',
+    )
+
     def __init__(
         self,
         ousd_ogn_split=Decimal(0.5),
@@ -44,105 +93,99 @@ class CalcParameters:
         self.eth_value_usd = eth_value_usd
         self.minimum_threshold = minimum_threshold
 
+        # Integer forms of the above so compensation math can avoid Decimal
+        self.split_threshold_wei = int(split_threshold)
+        [
+            self.ousd_ogn_split_num,
+            self.ousd_ogn_split_den
+        ] = Decimal(ousd_ogn_split).as_integer_ratio()
+        self.ogn_price_wei = int(ogn_price_usd)
+
 
 class Account:
+    # One instance per address, so skip the per-instance __dict__
+    __slots__ = (
+        'address',
+        'params',
+        'balances',
+        '_usdt_swap_ousd',
+        '_usdt_swap_amounts',
+        '_usdt_swap_directions',
+        '_usdc_swap_ousd',
+        '_usdc_swap_amounts',
+        '_usdc_swap_directions',
+        '_weth_swap_ousd',
+        '_weth_swap_amounts',
+        '_weth_swap_directions',
+        '_virgox_proceeds',
+        '_eligible',
+        '_adj_ousd',
+        '_adj_ogn',
+    )
+
     def __init__(self, address, params):
         self.address = address
         self.params = params
 
-        self._ousd_balance_start = 0
-        self._ousd_balance_end = 0
-
-        # LP balances, USDC and USDT have only 6 decimals!
-        self._usdt_balance_start = 0
-        self._usdt_balance_end = 0
-        self._usdc_balance_start = 0
-        self._usdc_balance_end = 0
-        self._weth_balance_start = 0
-        self._weth_balance_end = 0
-        self._ousd_lp_start = 0
-        self._ousd_lp_end = 0
-        self._usdt_lp_start = 0
-        self._usdt_lp_end = 0
-        self._usdc_lp_start = 0
-        self._usdc_lp_end = 0
-        self._weth_lp_start = 0
-        self._weth_lp_end = 0
-
-        self._usdt_swaps = []
-        self._usdc_swaps = []
-        self._weth_swaps = []
+        # Indexed by FIELD_INDEX
+        self.balances = [0] * len(BALANCE_FIELDS)
+
+        # Swaps are stored column-wise as OUSD amounts, token amounts and
+        # directions
+        self._usdt_swap_ousd = []
+        self._usdt_swap_amounts = []
+        self._usdt_swap_directions = []
+        self._usdc_swap_ousd = []
+        self._usdc_swap_amounts = []
+        self._usdc_swap_directions = []
+        self._weth_swap_ousd = []
+        self._weth_swap_amounts = []
+        self._weth_swap_directions = []
 
         self._virgox_proceeds = []
 
+        # Compensation values, stored by finalize()
+        self._eligible = None
+        self._adj_ousd = None
+        self._adj_ogn = None
+
     def _eth_to_usd(self, eth_value):
         """ Convert to USD value (18 decimals) """
         return eth_value * self.params.eth_value_usd
 
-    def add_ousd_balance_start(self, bal):
-        self._ousd_balance_start += int(bal)
-
-    def add_ousd_balance_end(self, bal):
-        self._ousd_balance_end += int(bal)
-
-    def add_usdt_balance_start(self, val):
-        self._usdt_balance_start += int(val)
-
-    def add_usdt_balance_end(self, val):
-        self._usdt_balance_end += int(val)
-
-    def add_usdc_balance_start(self, val):
-        self._usdc_balance_start += int(val)
-
-    def add_usdc_balance_end(self, val):
-        self._usdc_balance_end += int(val)
-
-    def add_weth_balance_start(self, val):
-        self._weth_balance_start += int(val)
-
-    def add_weth_balance_end(self, val):
-        self._weth_balance_end += int(val)
-
-    def add_ousd_lp_start(self, bal):
-        self._ousd_lp_start += int(bal)
-
-    def add_ousd_lp_end(self, bal):
-        self._ousd_lp_end += int(bal)
-
-    def add_usdt_lp_start(self, val):
-        self._usdt_lp_start += int(val)
-
-    def add_usdt_lp_end(self, val):
-        self._usdt_lp_end += int(val)
-
-    def add_usdc_lp_start(self, val):
-        self._usdc_lp_start += int(val)
-
-    def add_usdc_lp_end(self, val):
-        self._usdc_lp_end += int(val)
-
-    def add_weth_lp_start(self, val):
-        self._weth_lp_start += int(val)
-
-    def add_weth_lp_end(self, val):
-        self._weth_lp_end += int(val)
-
     def add_usdt_swap(self, swap):
         """ Swaps are tuple (ousd_value, usdt_value, direction) """
-        self._usdt_swaps.append(swap)
+        [ousd_value, usdt_value, direction] = swap
+        self._usdt_swap_ousd.append(int(ousd_value))
+        self._usdt_swap_amounts.append(int(usdt_value))
+        self._usdt_swap_directions.append(direction.value)
 
     def add_usdc_swap(self, swap):
         """ Swaps are tuple (ousd_value, usdc_value, direction) """
-        self._usdc_swaps.append(swap)
+        [ousd_value, usdc_value, direction] = swap
+        self._usdc_swap_ousd.append(int(ousd_value))
+        self._usdc_swap_amounts.append(int(usdc_value))
+        self._usdc_swap_directions.append(direction.value)
 
     def add_weth_swap(self, swap):
         """ Swaps are tuple (ousd_value, weth_value, direction) """
-        self._weth_swaps.append(swap)
+        [ousd_value, weth_value, direction] = swap
+        self._weth_swap_ousd.append(int(ousd_value))
+        self._weth_swap_amounts.append(int(weth_value))
+        self._weth_swap_directions.append(direction.value)
 
     def add_virgox_proceed(self, usd_proceeds):
         """ Each "proceed" is a sale of OUSD for an unknown asset """
         self._virgox_proceeds.append(usd_proceeds)
 
+    def finalize(self):
+        """ Compute and store the compensation values.  Call only after all
+        balances and swaps have been added.
+        """
+        self._eligible = self.eligible_balance_usd
+        self._adj_ousd = self.adjusted_ousd_compensation
+        self._adj_ogn = self.adjusted_ogn_compensation
+
     def to_list(self):
         """ Display this account in a list with these values:
 
@@ -152,86 +195,81 @@ class Account:
         """
         return [
             self.address,
-            locale.currency(
-                Decimal(self.eligible_balance_usd) / Decimal(1e18),
-                symbol=False,
-                grouping=True
-            ),
-            locale.currency(
-                Decimal(self.adjusted_ousd_compensation) / Decimal(1e18),
-                symbol=False,
-                grouping=True
-            ),
-            locale.currency(
-                Decimal(self.adjusted_ogn_compensation) * Decimal(1.25) / Decimal(1e18),
-                symbol=False,
-                grouping=True
-            ),
-            locale.currency(
-                Decimal(self.adjusted_ogn_compensation) / Decimal(1e18),
-                symbol=False,
-                grouping=True
-            ),
+            format_usd(Decimal(self.eligible_balance_usd) / Decimal(WAD)),
+            format_usd(Decimal(self.adjusted_ousd_compensation) / Decimal(WAD)),
+            format_usd(Decimal(self.adjusted_ogn_compensation) * Decimal(1.25) / Decimal(WAD)),
+            format_usd(Decimal(self.adjusted_ogn_compensation) / Decimal(WAD)),
             Decimal(self.eligible_balance_usd),
             Decimal(self.adjusted_ousd_compensation),
             Decimal(self.adjusted_ogn_compensation)
         ]
 
-    def to_csv_row(self):
-        """ Print a CSV row
-
-        address, eligible_ousd_value_human, ousd_compensation_human,
-        ogn_compensation_w_interest_human, ogn_compensation_human,
-        eligible_ousd_value, ousd_compensation, ogn_compensation
-        """
-        return ','.join(['"{}"'.format(x) if ',' in str(x) else str(x) for x in self.to_list()])
-
     @property
     def usdt_swap_in(self):
         """ Incoming USDT from OUSD swaps """
         return sum(
-            [int(x[1]) if x[2] == Direction.RIGHT else 0 for x in self._usdt_swaps]
+            amount for amount, direction in zip(
+                self._usdt_swap_amounts,
+                self._usdt_swap_directions
+            ) if direction == RIGHT
         )
 
     @property
     def usdt_swap_out(self):
         """ Outgoing USDT from OUSD swaps """
         return sum(
-            [int(x[1]) if x[2] == Direction.LEFT else 0 for x in self._usdt_swaps]
+            amount for amount, direction in zip(
+                self._usdt_swap_amounts,
+                self._usdt_swap_directions
+            ) if direction == LEFT
         )
 
     @property
     def usdc_swap_in(self):
         """ Incoming USDC from OUSD swaps """
         return sum(
-            [int(x[1]) if x[2] == Direction.RIGHT else 0 for x in self._usdc_swaps]
+            amount for amount, direction in zip(
+                self._usdc_swap_amounts,
+                self._usdc_swap_directions
+            ) if direction == RIGHT
         )
 
     @property
     def usdc_swap_out(self):
         """ Outgoing USDC from OUSD swaps """
         return sum(
-            [int(x[1]) if x[2] == Direction.LEFT else 0 for x in self._usdc_swaps]
+            amount for amount, direction in zip(
+                self._usdc_swap_amounts,
+                self._usdc_swap_directions
+            ) if direction == LEFT
         )
 
     @property
     def weth_swap_in(self):
         """ Incoming WETH from OUSD swaps """
         return sum(
-            [int(x[1]) if x[2] == Direction.RIGHT else 0 for x in self._weth_swaps]
+            amount for amount, direction in zip(
+                self._weth_swap_amounts,
+                self._weth_swap_directions
+            ) if direction == RIGHT
         )
 
     @property
     def weth_swap_out(self):
         """ Outgoing WETH from OUSD swaps """
         return sum(
-            [int(x[1]) if x[2] == Direction.LEFT else 0 for x in self._weth_swaps]
+            amount for amount, direction in zip(
+                self._weth_swap_amounts,
+                self._weth_swap_directions
+            ) if direction == LEFT
         )
 
     @property
     def trading_gain_usdt(self):
         """ Net USDT gains from trading OUSD after the hack """
-        if (self._ousd_balance_start + self._ousd_lp_start) <= 0:
+        balances = self.balances
+
+        if balances[OUSD_BALANCE_START] + balances[OUSD_LP_START] <= 0:
             return 0
 
         return self.usdt_swap_in - self.usdt_swap_out
@@ -239,7 +277,9 @@ class Account:
     @property
     def trading_gain_usdc(self):
         """ Net USDC gains from trading OUSD after the hack """
-        if (self._ousd_balance_start + self._ousd_lp_start) <= 0:
+        balances = self.balances
+
+        if balances[OUSD_BALANCE_START] + balances[OUSD_LP_START] <= 0:
             return 0
 
         return self.usdc_swap_in - self.usdc_swap_out
@@ -247,7 +287,9 @@ class Account:
     @property
     def trading_gain_weth(self):
         """ Net WETH gains from trading OUSD after the hack """
-        if (self._ousd_balance_start + self._ousd_lp_start) <= 0:
+        balances = self.balances
+
+        if balances[OUSD_BALANCE_START] + balances[OUSD_LP_START] <= 0:
             return 0
 
         return self.weth_swap_in - self.weth_swap_out
@@ -258,7 +300,7 @@ class Account:
         if not self._virgox_proceeds:
             return 0
 
-        return sum([x for x in self._virgox_proceeds])
+        return sum(self._virgox_proceeds)
 
     @property
     def trading_gain_total_usd(self):
@@ -267,8 +309,8 @@ class Account:
         NOTE: We're just using $1 value for USDT and USDC
         """
         return (
-            convert_decimals(self.trading_gain_usdt, 6, 18)
-            + convert_decimals(self.trading_gain_usdc, 6, 18)
+            self.trading_gain_usdt * _USD6_TO_18
+            + self.trading_gain_usdc * _USD6_TO_18
             + self._eth_to_usd(self.trading_gain_weth)
             + self.trading_gain_virgox
         )
@@ -276,9 +318,12 @@ class Account:
     @property
     def eligible_balance_usd(self):
         """ Return the reimbursable balance """
+        if self._eligible is not None:
+            return self._eligible
+
         diff = (
-            self._ousd_balance_start
-            + self._ousd_lp_start
+            self.balances[OUSD_BALANCE_START]
+            + self.balances[OUSD_LP_START]
             - max(self.trading_gain_total_usd, 0)
         )
 
@@ -290,50 +335,99 @@ class Account:
     @property
     def adjusted_ousd_compensation(self):
         """ Amount of OUSD this account can be compensated for """
+        if self._adj_ousd is not None:
+            return self._adj_ousd
 
         eligible = self.eligible_balance_usd
 
         # If their eligible compensation is less than the threshold,
         # compensation is 100% OUSD
-        if eligible <= self.params.split_threshold:
+        if eligible <= self.params.split_threshold_wei:
             return eligible
 
         # The amount above the given threshold
-        above_split = Decimal(eligible) - self.params.split_threshold
+        above_split = int(eligible) - self.params.split_threshold_wei
 
-        return floor(
-            self.params.split_threshold + (
-                above_split * self.params.ousd_ogn_split
-            )
+        return self.params.split_threshold_wei + (
+            above_split
+            * self.params.ousd_ogn_split_num
+            // self.params.ousd_ogn_split_den
         )
 
     @property
     def adjusted_ogn_compensation(self):
         """ Amount of OGN this account can be compensated for """
+        if self._adj_ogn is not None:
+            return self._adj_ogn
 
         eligible = self.eligible_balance_usd
 
         # If their eligible compensation is less than the threshold,
         # compensation is 100% OUSD
-        if eligible <= self.params.split_threshold:
+        if eligible <= self.params.split_threshold_wei:
             return 0
 
-        above_split = Decimal(eligible) - self.params.split_threshold
+        above_split = int(eligible) - self.params.split_threshold_wei
 
         # The OGN side of the original OUSD value split
-        ogn_usd_value = above_split - floor(
-            above_split * self.params.ousd_ogn_split
+        ogn_usd_value = above_split - (
+            above_split
+            * self.params.ousd_ogn_split_num
+            // self.params.ousd_ogn_split_den
         )
 
         # Sanity check
         assert ogn_usd_value + self.adjusted_ousd_compensation == self.eligible_balance_usd
 
         # Actual OGN according to given price
-        return floor(ogn_usd_value / self.params.ogn_price_usd * Decimal(1e18))
+        return ogn_usd_value * WAD // self.params.ogn_price_wei
+
 
+# token1 => ((OUSD, token1) LP start fields, (OUSD, token1) LP end fields)
+LP_FIELDS = {
+    token1_address: tuple(
+        (
+            FIELD_INDEX['ousd_lp_{}'.format(when)],
+            FIELD_INDEX['{}_lp_{}'.format(token1, when)],
+        )
+        for when in ('start', 'end')
+    )
+    for token1_address, token1 in (
+        (USDT_ADDRESS, 'usdt'),
+        (USDC_ADDRESS, 'usdc'),
+        (WETH_ADDRESS, 'weth'),
+    )
+}
+
+# token1 => swap adder
+SWAP_ADDERS = {
+    USDT_ADDRESS: Account.add_usdt_swap,
+    USDC_ADDRESS: Account.add_usdc_swap,
+    WETH_ADDRESS: Account.add_weth_swap,
+}
+
+# Pick out only the CSV columns the loaders use, in C rather than by
+# unpacking every field of every row
+BALANCE_COLUMNS = itemgetter(0, 1)  # address, ousd_balance
+LP_COLUMNS = itemgetter(1, 2, 4, 5)  # token1, lp_address, token0/1_value
+SWAP_COLUMNS = itemgetter(1, 3, 4, 5, 6, 7)  # token1, in/out, dir, amounts
+STAKER_COLUMNS = itemgetter(0, 3)  # staker_address, ratioed_ousd_balance
+VIRGOX_COLUMNS = itemgetter(0, 3)  # address, usd_proceeds
+
+
+def format_usd(value):
+    """ Human readable dollar amount with thousands separators, like
+    locale.currency(value, symbol=False, grouping=True) in an en_US locale
+    """
+    return '{:,.2f}'.format(float(value))
 
-def convert_decimals(val, decin, decout):
-    return int(val * pow(10, decout - decin))
+
+@lru_cache(maxsize=None)
+def checksum_address(address):
+    """ Checksumming hashes the address, and the same addresses show up in
+    many rows, so only do it once per address
+    """
+    return Web3.toChecksumAddress(address)
 
 
 def parse_args(argv):
@@ -351,19 +445,26 @@ def parse_args(argv):
     return parser.parse_args(argv)
 
 
-def csv_to_list(fname, discard_first_row=False):
-    csvdata = list(csv.reader(Path(fname).resolve().open()))
+def iter_csv(fname, skip_header=False):
+    """ Yield the rows of a CSV file one at a time """
+    with Path(fname).resolve().open() as csvfile:
+        reader = csv.reader(csvfile)
+
+        if skip_header:
+            next(reader, None)
+
+        yield from reader
 
-    if discard_first_row:
-        return csvdata[1:]
 
-    return csvdata
+def get_or_create_account(accounts_dict, address, params):
+    """ Get the Account for an address, creating it if it doesn't exist """
+    address = checksum_address(address)
+    account = accounts_dict.get(address)
 
+    if account is None:
+        account = accounts_dict[address] = Account(address, params)
 
-def create_account_if_not_exists(accounts_dict, address, params):
-    address = Web3.toChecksumAddress(address)
-    if accounts_dict.get(address) is None:
-        accounts_dict[address] = Account(address, params)
+    return account
 
 
 def process_uniswap_lp_data(csvdata, accounts, params, is_start=True):
@@ -373,51 +474,26 @@ def process_uniswap_lp_data(csvdata, accounts, params, is_start=True):
     token0,token1,lp_address,lp_balance,approx_token0,approx_token1
     """
 
-    for lp in csvdata:
-        [
-            token0,
-            token1,
-            lp_address,
-            lp_balance,
-            token0_value,
-            token1_value
-        ] = lp
-
-        create_account_if_not_exists(accounts, lp_address, params)
-
-        if is_start:
-            accounts[lp_address].add_ousd_lp_start(token0_value)
-
-            if token1 == USDT_ADDRESS:
-                accounts[lp_address].add_usdt_lp_start(token1_value)
-            elif token1 == USDC_ADDRESS:
-                accounts[lp_address].add_usdc_lp_start(token1_value)
-            elif token1 == WETH_ADDRESS:
-                accounts[lp_address].add_weth_lp_start(token1_value)
-            else:
-                print(
-                    '{} is part of an unknown token pair!'.format(token1),
-                    file=sys.stderr
-                )
-                # Something's fucky, bail
-                sys.exit(1)
-
-        else:
-            accounts[lp_address].add_ousd_lp_end(token0_value)
-
-            if token1 == USDT_ADDRESS:
-                accounts[lp_address].add_usdt_lp_end(token1_value)
-            elif token1 == USDC_ADDRESS:
-                accounts[lp_address].add_usdc_lp_end(token1_value)
-            elif token1 == WETH_ADDRESS:
-                accounts[lp_address].add_weth_lp_end(token1_value)
-            else:
-                print(
-                    '{} is part of an unknown token pair!'.format(token1),
-                    file=sys.stderr
-                )
-                # Something's fucky, bail
-                sys.exit(1)
+    for [token1, lp_address, token0_value, token1_value] in map(
+        LP_COLUMNS,
+        csvdata
+    ):
+        account = get_or_create_account(accounts, lp_address, params)
+
+        fields = LP_FIELDS.get(token1)
+
+        if fields is None:
+            print(
+                '{} is part of an unknown token pair!'.format(token1),
+                file=sys.stderr
+            )
+            # Something's fucky, bail
+            sys.exit(1)
+
+        [ousd_field, token_field] = fields[0 if is_start else 1]
+        balances = account.balances
+        balances[ousd_field] += int(token0_value)
+        balances[token_field] += int(token1_value)
 
 
 def process_uniswap_swap_data(csvdata, accounts, params):
@@ -427,44 +503,25 @@ def process_uniswap_swap_data(csvdata, accounts, params):
     swap_direction,token0_amount,token1_amount,token_in,token_out,
     token0_relevance,tx_hash
     """
-    for swap in csvdata:
-        [
-            token0,
-            token1,
-            block_number,
-            in_address,
-            out_address,
-            swap_direction,
-            token0_amount,
-            token1_amount,
-            token_in,
-            token_out,
-            token0_relevance,
-            tx_hash
-        ] = swap
-
-        create_account_if_not_exists(accounts, in_address, params)
-        create_account_if_not_exists(accounts, out_address, params)
+    for [
+        token1,
+        in_address,
+        out_address,
+        swap_direction,
+        token0_amount,
+        token1_amount
+    ] in map(SWAP_COLUMNS, csvdata):
+        in_account = get_or_create_account(accounts, in_address, params)
+        get_or_create_account(accounts, out_address, params)
 
         direction = Direction.RIGHT
 
         if swap_direction == 'buy':
             direction = Direction.LEFT
 
-        # Swap tuple format: (ousd_value, usdt_value, direction)
-        if token1 == USDT_ADDRESS:
-            accounts[in_address].add_usdt_swap(
-                (token0_amount, token1_amount, direction)
-            )
-        elif token1 == USDC_ADDRESS:
-            accounts[in_address].add_usdc_swap(
-                (token0_amount, token1_amount, direction)
-            )
-        elif token1 == WETH_ADDRESS:
-            accounts[in_address].add_weth_swap(
-                (token0_amount, token1_amount, direction)
-            )
-        else:
+        add_swap = SWAP_ADDERS.get(token1)
+
+        if add_swap is None:
             print(
                 '{} is part of an unknown token pair!'.format(token1),
                 file=sys.stderr
@@ -472,6 +529,12 @@ def process_uniswap_swap_data(csvdata, accounts, params):
             # Something's fucky, bail
             sys.exit(1)
 
+        # Swap tuple format: (ousd_value, token1_value, direction)
+        add_swap(
+            in_account,
+            (token0_amount, token1_amount, direction)
+        )
+
 
 def load_address_list(fname):
     addresslist_file = Path(fname).resolve()
@@ -482,27 +545,28 @@ def load_address_list(fname):
 
     for x in addresslist_file.read_text().split('\n'):
         if x and not x.startswith('#'):
-            addresses.append(Web3.toChecksumAddress(x))
+            addresses.append(checksum_address(x))
 
     return addresses
 
 
-def main():
-    args = parse_args(sys.argv[1:])
-    outdir = Path(args.outdir).resolve()
+def input_files(outdir, start, end):
+    """ All the files the accounts are loaded from """
+    files = [VIRGOX_PROCEEDS]
 
-    params = CalcParameters(
-        split_threshold=Decimal(1000e18),
-        ousd_ogn_split=Decimal(0.25),  # 25% OUSD / 75% OGN
-        ogn_price_usd=Decimal(1492e14),  # $0.1492
-        eth_value_usd=578.24,  # USD
-        minimum_threshold=1e16  # $0.01
-    )
+    for name in ('ousd_balances', 'uniswap_lp', 'sushiswap_lp',
+                 'mooniswap_lp', 'snowswap_stakers'):
+        files.append(outdir.joinpath('{}_{}.csv'.format(name, start)))
+        files.append(outdir.joinpath('{}_{}.csv'.format(name, end)))
 
-    blacklist = []
-    if args.blacklist:
-        blacklist = load_address_list(args.blacklist)
+    for name in ('uniswap_swaps', 'sushiswap_swaps', 'mooniswap_swaps'):
+        files.append(outdir.joinpath('{}_{}-{}.csv'.format(name, start, end)))
 
+    return files
+
+
+def load_accounts(outdir, start, end, params):
+    """ Load all balances, LP positions and swaps into Accounts """
     # address => Account
     accounts = {}
 
@@ -511,38 +575,42 @@ def main():
     """
 
     # CSV format: address,ousd_balance,is_contract
-    account_balances_before = csv_to_list(
-        outdir.joinpath('ousd_balances_{}.csv'.format(args.start))
+    account_balances_before = iter_csv(
+        outdir.joinpath('ousd_balances_{}.csv'.format(start))
     )
 
-    for account in account_balances_before:
-        [address, ousd_balance, is_contract] = account
-        create_account_if_not_exists(accounts, address, params)
-        accounts[address].add_ousd_balance_start(ousd_balance)
+    for [address, ousd_balance] in map(
+        BALANCE_COLUMNS,
+        account_balances_before
+    ):
+        account = get_or_create_account(accounts, address, params)
+        account.balances[OUSD_BALANCE_START] += int(ousd_balance)
 
     # CSV format: address,ousd_balance,is_contract
-    account_balances_after = csv_to_list(
-        outdir.joinpath('ousd_balances_{}.csv'.format(args.end))
+    account_balances_after = iter_csv(
+        outdir.joinpath('ousd_balances_{}.csv'.format(end))
     )
 
-    for account in account_balances_after:
-        [address, ousd_balance, is_contract] = account
-        create_account_if_not_exists(accounts, address, params)
-        accounts[address].add_ousd_balance_end(ousd_balance)
+    for [address, ousd_balance] in map(
+        BALANCE_COLUMNS,
+        account_balances_after
+    ):
+        account = get_or_create_account(accounts, address, params)
+        account.balances[OUSD_BALANCE_END] += int(ousd_balance)
 
     """
     LOAD LIQUIDITY PROVIDER BALANCES
     """
 
     # CSV format: token0,token1,lp_address,lp_balance,token0_value,token1_value
-    uniswap_lp_balances_before = csv_to_list(
-        outdir.joinpath('uniswap_lp_{}.csv'.format(args.start))
+    uniswap_lp_balances_before = iter_csv(
+        outdir.joinpath('uniswap_lp_{}.csv'.format(start))
     )
 
     process_uniswap_lp_data(uniswap_lp_balances_before, accounts, params)
 
-    uniswap_lp_balances_after = csv_to_list(
-        outdir.joinpath('uniswap_lp_{}.csv'.format(args.end))
+    uniswap_lp_balances_after = iter_csv(
+        outdir.joinpath('uniswap_lp_{}.csv'.format(end))
     )
 
     process_uniswap_lp_data(
@@ -552,14 +620,14 @@ def main():
         is_start=False
     )
 
-    sushiswap_lp_balances_before = csv_to_list(
-        outdir.joinpath('sushiswap_lp_{}.csv'.format(args.start))
+    sushiswap_lp_balances_before = iter_csv(
+        outdir.joinpath('sushiswap_lp_{}.csv'.format(start))
     )
 
     process_uniswap_lp_data(sushiswap_lp_balances_before, accounts, params)
 
-    sushiswap_lp_balances_after = csv_to_list(
-        outdir.joinpath('sushiswap_lp_{}.csv'.format(args.end))
+    sushiswap_lp_balances_after = iter_csv(
+        outdir.joinpath('sushiswap_lp_{}.csv'.format(end))
     )
 
     process_uniswap_lp_data(
@@ -569,14 +637,14 @@ def main():
         is_start=False
     )
 
-    mooniswap_lp_balances_before = csv_to_list(
-        outdir.joinpath('mooniswap_lp_{}.csv'.format(args.start))
+    mooniswap_lp_balances_before = iter_csv(
+        outdir.joinpath('mooniswap_lp_{}.csv'.format(start))
     )
 
     process_uniswap_lp_data(mooniswap_lp_balances_before, accounts, params)
 
-    mooniswap_lp_balances_after = csv_to_list(
-        outdir.joinpath('mooniswap_lp_{}.csv'.format(args.end))
+    mooniswap_lp_balances_after = iter_csv(
+        outdir.joinpath('mooniswap_lp_{}.csv'.format(end))
     )
 
     process_uniswap_lp_data(
@@ -590,53 +658,37 @@ def main():
     LOAD SNOWSWAP STAKER BALANCES
     """
 
-    snowswap_staker_balances_before = csv_to_list(
-        outdir.joinpath('snowswap_stakers_{}.csv'.format(args.start))
+    snowswap_staker_balances_before = iter_csv(
+        outdir.joinpath('snowswap_stakers_{}.csv'.format(start))
     )
 
-    for stake in snowswap_staker_balances_before:
-        [
-            staker_address,
-            credit_balance,
-            ousd_balance,
-            ratioed_ousd_balance
-        ] = stake
-
-        create_account_if_not_exists(accounts, staker_address, params)
-
-        accounts[staker_address].add_ousd_balance_start(ratioed_ousd_balance)
+    for [staker_address, ratioed_ousd_balance] in map(
+        STAKER_COLUMNS,
+        snowswap_staker_balances_before
+    ):
+        staker = get_or_create_account(accounts, staker_address, params)
+        staker.balances[OUSD_BALANCE_START] += int(ratioed_ousd_balance)
 
-    snowswap_staker_balances_after = csv_to_list(
-        outdir.joinpath('snowswap_stakers_{}.csv'.format(args.end))
+    snowswap_staker_balances_after = iter_csv(
+        outdir.joinpath('snowswap_stakers_{}.csv'.format(end))
     )
 
-    for stake in snowswap_staker_balances_after:
-        [
-            staker_address,
-            credit_balance,
-            ousd_balance,
-            ratioed_ousd_balance
-        ] = stake
-
-        create_account_if_not_exists(accounts, staker_address, params)
-
-        accounts[staker_address].add_ousd_balance_end(ratioed_ousd_balance)
+    for [staker_address, ratioed_ousd_balance] in map(
+        STAKER_COLUMNS,
+        snowswap_staker_balances_after
+    ):
+        staker = get_or_create_account(accounts, staker_address, params)
+        staker.balances[OUSD_BALANCE_END] += int(ratioed_ousd_balance)
 
     """
     LOAD VIRGOX TRADING GAINS (POST-HACK)
     """
 
     # Address,Amount,Price,Proceeds
-    virgox_proceeds = csv_to_list(VIRGOX_PROCEEDS, discard_first_row=True)
-
-    for vp in virgox_proceeds:
-        [address, amount, price, usd_proceeds] = vp
-
-        address = Web3.toChecksumAddress(address)
-
-        create_account_if_not_exists(accounts, address, params)
+    virgox_proceeds = iter_csv(VIRGOX_PROCEEDS, skip_header=True)
 
-        accounts[address].add_virgox_proceed(
+    for [address, usd_proceeds] in map(VIRGOX_COLUMNS, virgox_proceeds):
+        get_or_create_account(accounts, address, params).add_virgox_proceed(
             # Since we're working with integers
             int(Decimal(usd_proceeds) * Decimal(1e18))
         )
@@ -645,39 +697,90 @@ def main():
     LOAD SWAPS (POST-HACK)
     """
 
-    uniswap_swaps = csv_to_list(
-        outdir.joinpath('uniswap_swaps_{}-{}.csv'.format(args.start, args.end))
+    uniswap_swaps = iter_csv(
+        outdir.joinpath('uniswap_swaps_{}-{}.csv'.format(start, end))
     )
 
     process_uniswap_swap_data(uniswap_swaps, accounts, params)
 
-    sushiswap_swaps = csv_to_list(
+    sushiswap_swaps = iter_csv(
         outdir.joinpath('sushiswap_swaps_{}-{}.csv'.format(
-            args.start,
-            args.end
+            start,
+            end
         ))
     )
 
     process_uniswap_swap_data(sushiswap_swaps, accounts, params)
 
-    mooniswap_swaps = csv_to_list(
+    mooniswap_swaps = iter_csv(
         outdir.joinpath('mooniswap_swaps_{}-{}.csv'.format(
-            args.start,
-            args.end
+            start,
+            end
         ))
     )
 
     process_uniswap_swap_data(mooniswap_swaps, accounts, params)
 
+    return accounts
+
+
+def load_accounts_cached(outdir, start, end, params):
+    """ Parsing the CSVs is the slow part, so keep the loaded accounts around
+    until any of the input files (or this script) change.  Compensation
+    parameters are not part of the key, they are only used after loading.
+    """
+    key = hashlib.sha256(repr((
+        start,
+        end,
+        [
+            (str(f), f.stat().st_mtime_ns, f.stat().st_size)
+            for f in [ME] + input_files(outdir, start, end)
+        ]
+    )).encode()).hexdigest()
+    cache_file = ACCOUNTS_CACHE_DIR.joinpath('accounts_{}.pkl'.format(key))
+
+    if cache_file.is_file():
+        accounts = pickle.loads(cache_file.read_bytes())
+
+        for account in accounts.values():
+            account.params = params
+
+        return accounts
+
+    accounts = load_accounts(outdir, start, end, params)
+    ACCOUNTS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cache_file.write_bytes(pickle.dumps(accounts, pickle.HIGHEST_PROTOCOL))
+
+    return accounts
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    outdir = Path(args.outdir).resolve()
+
+    params = CalcParameters(
+        split_threshold=Decimal(1000e18),
+        ousd_ogn_split=Decimal(0.25),  # 25% OUSD / 75% OGN
+        ogn_price_usd=Decimal(1492e14),  # $0.1492
+        eth_value_usd=578.24,  # USD
+        minimum_threshold=1e16  # $0.01
+    )
+
+    blacklist = []
+    if args.blacklist:
+        blacklist = load_address_list(args.blacklist)
+
+    accounts = load_accounts_cached(outdir, args.start, args.end, params)
+
     if args.account:
-        account = Web3.toChecksumAddress(args.account)
+        account = checksum_address(args.account)
         print('ousd_balance_start: {} ({})'.format(
-            accounts[account]._ousd_balance_start,
-            accounts[account]._ousd_balance_start / 1e18
+            accounts[account].balances[OUSD_BALANCE_START],
+            accounts[account].balances[OUSD_BALANCE_START] / 1e18
         ))
         print('ousd_lp_start: {} ({})'.format(
-            accounts[account]._ousd_lp_start,
-            accounts[account]._ousd_lp_start / 1e18
+            accounts[account].balances[OUSD_LP_START],
+            accounts[account].balances[OUSD_LP_START] / 1e18
         ))
         print('eligible balance: {} (${})'.format(
             accounts[account].eligible_balance_usd,
@@ -695,21 +798,47 @@ def main():
                 accounts[account].adjusted_ogn_compensation / 1e18
             )
         )
-        print('USDT swaps:', accounts[account]._usdt_swaps)
-        print('USDC swaps:', accounts[account]._usdc_swaps)
-        print('WETH swaps:', accounts[account]._weth_swaps)
+        print('USDT swaps:', list(zip(
+            accounts[account]._usdt_swap_ousd,
+            accounts[account]._usdt_swap_amounts,
+            accounts[account]._usdt_swap_directions
+        )))
+        print('USDC swaps:', list(zip(
+            accounts[account]._usdc_swap_ousd,
+            accounts[account]._usdc_swap_amounts,
+            accounts[account]._usdc_swap_directions
+        )))
+        print('WETH swaps:', list(zip(
+            accounts[account]._weth_swap_ousd,
+            accounts[account]._weth_swap_amounts,
+            accounts[account]._weth_swap_directions
+        )))
 
     else:
         # CSV out compensation numbers
         # address, eligible_ousd_value_human, ousd_compensation_human,
         # ogn_compensation_w_interest_human, ogn_compensation_human, eligible_ousd_value,
         # ousd_compensation, ogn_compensation
-        print('address,eligible_ousd_value_human,ousd_compensation_human,ogn_compensation_w_interest_human,ogn_compensation_human,eligible_ousd_value,ousd_compensation,ogn_compensation')
+        rows = [[
+            'address',
+            'eligible_ousd_value_human',
+            'ousd_compensation_human',
+            'ogn_compensation_w_interest_human',
+            'ogn_compensation_human',
+            'eligible_ousd_value',
+            'ousd_compensation',
+            'ogn_compensation'
+        ]]
         for addr in accounts.keys():
+            accounts[addr].finalize()
+
             if addr in blacklist or accounts[addr].eligible_balance_usd == 0:
                 continue
 
-            print(accounts[addr].to_csv_row())
+            rows.append(accounts[addr].to_list())
+
+        # Written in one go, csv.writer takes care of quoting
+        csv.writer(sys.stdout, lineterminator='\n').writerows(rows)
 
 
 if __name__ == "__main__":
@@ -5,41 +5,26 @@ CSV format out:
 token0,token1,lp_address,lp_balance,approx_token0,approx_token1
 """
 import sys
-import json
-from decimal import Decimal
-from math import floor
-from pathlib import Path
+import csv
 from argparse import ArgumentParser
 from web3 import Web3
+from jsonrpc import batch_call
+from logs import event_topic
+from event_cache import get_events_cached
+from multicall import multicall_balance_of
+from abi_cache import load_abi
 
-ME = Path(__file__).resolve()
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 OUSD_ADDRESS = "0x2A8e1E676Ec238d8A992307B495b45B3fEAa5e86"
-OUSD_ABI = json.load(
-    ME.parent.joinpath('metadata/OUSD.json').open()
-).get('abi')
+OUSD_ABI = load_abi('OUSD')
 FACTORY_ADDRESS = "0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f"
-FACTORY_ABI = json.load(
-    ME.parent.joinpath('metadata/IUniswapV2Factory.json').open()
-).get('abi')
-PAIR_ABI = json.load(
-    ME.parent.joinpath('metadata/IUniswapV2Pair.json').open()
-).get('abi')
+FACTORY_ABI = load_abi('IUniswapV2Factory')
+PAIR_ABI = load_abi('IUniswapV2Pair')
 MINIMUM_LIQUIDITY = 1000
 MAX_ROUNDING_DRIFT = 10
+WAD = 10**18
 
-ADD_LIQUDITY_SIG = "0xe8e33700"
-ADD_LIQUDITY_ETH_SIG = "0xf305d719"
-
-
-def dict_get(d, path):
-    pparts = path.split('.')
-    lp = len(pparts)
-    if lp < 1:
-        return None
-    elif lp > 1:
-        return dict_get(d.get(pparts[0]), '.'.join(pparts[1:]))
-    return d.get(path)
+TRANSFER_TOPIC = event_topic('Transfer(address,address,uint256)')
 
 
 def parse_args(argv):
@@ -59,11 +44,8 @@ def parse_args(argv):
 
 
 def ousd_value_adjustment(token_balance, from_cpt, to_cpt):
-    token_balance = Decimal(token_balance)
-    from_cpt = Decimal(from_cpt)
-    to_cpt = Decimal(to_cpt)
-    credits = floor(token_balance * from_cpt / Decimal(1e18))
-    return floor(credits * Decimal(1e18) / to_cpt)
+    credits = token_balance * from_cpt // WAD
+    return credits * WAD // to_cpt
 
 
 def main():
@@ -85,89 +67,70 @@ def main():
 
     pair = web3.eth.contract(address=pair_address, abi=PAIR_ABI)
 
-    total_supply = pair.functions.totalSupply().call(
-        block_identifier=block_number
-    )
-    [a_supply, b_supply, blockstamp] = pair.functions.getReserves().call(
-        block_identifier=block_number
-    )
+    setup_calls = [
+        (pair, 'totalSupply', []),
+        (pair, 'getReserves', []),
+    ]
 
     ousd = None
     current_cpt = None
     to_cpt = None
     if a == OUSD_ADDRESS or b == OUSD_ADDRESS:
         ousd = web3.eth.contract(address=OUSD_ADDRESS, abi=OUSD_ABI)
-        current_cpt = int(ousd.functions.rebasingCreditsPerToken().call(
-            block_identifier=block_number
-        ), 16)
+        setup_calls.append((ousd, 'rebasingCreditsPerToken', []))
         if args.credits_per_token:
             to_cpt = int(args.credits_per_token)
 
-    addresses_of_interest = []
+    setup_results = batch_call(web3, setup_calls, block_number)
+    [total_supply, [a_supply, b_supply, blockstamp]] = setup_results[:2]
 
-    mints_filter = pair.events.Mint.createFilter(
-        fromBlock=0,
-        toBlock=block_number
-    )
-    mints = mints_filter.get_all_entries()
-
-    for mint in mints:
-        mint_txhash = mint['transactionHash'].hex()
-        minter = dict_get(mint, 'args.sender')
-
-        # Need to get the TX because the Mint event doesn't have the tx origin
-        tx = web3.eth.getTransaction(mint_txhash)
-
-        if not (
-            tx.get('input').startswith(ADD_LIQUDITY_SIG)
-            or tx.get('input').startswith(ADD_LIQUDITY_ETH_SIG)
-        ):
-            print('UNKNOWN FUNCTION RESULTING IN EVENT:', tx['input'])
-            sys.exit(1)
-        else:
-            lp_addr = tx.get('from', minter)
-
-            # minter is probably always the V2 router
-            if (
-                lp_addr != ZERO_ADDRESS
-                and lp_addr not in addresses_of_interest
-            ):
-                addresses_of_interest.append(lp_addr)
-
-    transfers_filter = pair.events.Transfer.createFilter(
-        fromBlock=0,
-        toBlock=block_number
-    )
-    transfers = transfers_filter.get_all_entries()
+    if ousd:
+        current_cpt = int(setup_results[2], 16)
+
+    # Insertion ordered set so the CSV output order is stable
+    addresses_of_interest = {}
+
+    # Every LP, minters included, received their LP tokens in a Transfer
+    transfer_event = pair.events.Transfer()
+    transfers = [
+        transfer_event.processLog(log) for log in get_events_cached(
+            web3,
+            pair.address,
+            [TRANSFER_TOPIC],
+            0,
+            block_number
+        )
+    ]
 
     for transfer in transfers:
-        to_address = dict_get(transfer, 'args.to')
-        if (
-            to_address != ZERO_ADDRESS
-            and to_address not in addresses_of_interest
-        ):
-            addresses_of_interest.append(to_address)
+        to_address = transfer['args']['to']
+        if to_address != ZERO_ADDRESS:
+            addresses_of_interest[to_address] = None
 
     # Now that we have all the theoretical players, get their balance as of the
     # block
     running_total = 0
     running_total_a = 0
     running_total_b = 0
-    for addr in addresses_of_interest:
-        lp_balance = pair.functions.balanceOf(addr).call(
-            block_identifier=block_number
-        )
+    # Each holder's share is floored, losing up to a wei per token
+    holders = 0
+    lp_supply = total_supply - MINIMUM_LIQUIDITY
+    lp_balances = multicall_balance_of(
+        web3,
+        pair,
+        addresses_of_interest,
+        block_number
+    )
+
+    writer = csv.writer(sys.stdout, lineterminator='\n')
 
+    for addr, lp_balance in zip(addresses_of_interest, lp_balances):
         a_balance = 0
         b_balance = 0
         if lp_balance != 0:
-            ratio = Decimal(lp_balance) / Decimal(
-                total_supply - MINIMUM_LIQUIDITY
-            )
-            #a_balance = floor(a_supply * ratio)
-            #b_balance = floor(b_supply * ratio)
-            a_balance = a_supply * ratio
-            b_balance = b_supply * ratio
+            a_balance = a_supply * lp_balance // lp_supply
+            b_balance = b_supply * lp_balance // lp_supply
+            holders += 1
 
         running_total += lp_balance
         running_total_a += a_balance
@@ -188,13 +151,13 @@ def main():
                 )
 
         # token0,token1,lp_address,lp_balance,token0_value,token1_value
-        print('{},{},{},{},{},{}'.format(
+        writer.writerow((
             a,
             b,
             addr,
             lp_balance,
-            floor(a_balance),
-            floor(b_balance)
+            a_balance,
+            b_balance
         ))
 
     """ To ameliorate rounding errors and increase the theoretical minimum
@@ -203,21 +166,23 @@ def main():
     value. The burning happens automatically during the first liquidity
     provision, after which point the totalSupply is forevermore bounded.
     """
-    if running_total != total_supply - MINIMUM_LIQUIDITY:
+    if running_total != lp_supply:
         print('!!!!!!!!!!!!!!!!!!!!!! {} != {}  !!!!!!!!!!!!!!!!!!!!!!'.format(
             running_total,
             total_supply
         ), file=sys.stderr)
         sys.exit(1)
 
-    if a_supply - running_total_a > MAX_ROUNDING_DRIFT:
+    max_drift = MAX_ROUNDING_DRIFT + holders
+
+    if a_supply - running_total_a > max_drift:
         print('!!!!!!!!!!!!!!!!!!!!!! {} != {} (token0 supply) !!!!!!!'.format(
             running_total_a,
             a_supply
         ), file=sys.stderr)
         sys.exit(1)
 
-    if b_supply - running_total_b > MAX_ROUNDING_DRIFT:
+    if b_supply - running_total_b > max_drift:
         print('!!!!!!!!!!!!!!!!!!!!!! {} != {} (token1 supply) !!!!!!!'.format(
             running_total_b,
             b_supply
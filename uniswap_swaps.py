@@ -1,35 +1,199 @@
 import sys
-import json
-from math import floor
-from decimal import Decimal
-from pathlib import Path
+import csv
+import asyncio
+from itertools import groupby, product
+from functools import lru_cache
 from argparse import ArgumentParser
 from web3 import Web3
 from web3.logs import DISCARD
+from abi_cache import load_abi
+from jsonrpc import (
+    concurrent_requests,
+    decode_call_result,
+    format_receipt,
+    get_output_types,
+    is_method_not_found,
+    make_web3,
+    to_block_identifier,
+)
+from logs import event_topic
+from multicall import aggregate
+from event_cache import get_events_cached
 
 OUSD_ADDRESS = "0x2A8e1E676Ec238d8A992307B495b45B3fEAa5e86"
 FACTORY_ADDRESS = "0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f"
 
-ME = Path(__file__).resolve()
-OUSD_ABI = json.load(
-    ME.parent.joinpath('metadata/OUSD.json').open()
-).get('abi')
-FACTORY_ABI = json.load(
-    ME.parent.joinpath('metadata/IUniswapV2Factory.json').open()
-).get('abi')
-PAIR_ABI = json.load(
-    ME.parent.joinpath('metadata/IUniswapV2Pair.json').open()
-).get('abi')
-
-
-def dict_get(d, path):
-    pparts = path.split('.')
-    lp = len(pparts)
-    if lp < 1:
-        return None
-    elif lp > 1:
-        return dict_get(d.get(pparts[0]), '.'.join(pparts[1:]))
-    return d.get(path)
+OUSD_ABI = load_abi('OUSD')
+FACTORY_ABI = load_abi('IUniswapV2Factory')
+PAIR_ABI = load_abi('IUniswapV2Pair')
+
+WAD = 10**18
+SWAP_TOPIC = event_topic(
+    'Swap(address,uint256,uint256,uint256,uint256,address)'
+)
+
+# keccak('token0()')[:4] and keccak('token1()')[:4]
+TOKEN0_SELECTOR = '0x0dfe1681'
+TOKEN1_SELECTOR = '0xd21220a7'
+
+# pair address => (token0, token1)
+PAIR_TOKENS = {}
+
+
+def bytes_to_address(data):
+    """ Checksummed address from the return data of an address getter """
+    return Web3.toChecksumAddress('0x' + bytes(data)[-20:].hex())
+
+
+def prefetch_pair_tokens(web3, pair_addresses):
+    """ Look up (token0, token1) of all the given pairs that are not in
+    PAIR_TOKENS yet with a multicall
+    """
+    missing = [
+        address for address in dict.fromkeys(pair_addresses)
+        if address not in PAIR_TOKENS
+    ]
+
+    if not missing:
+        return
+
+    try:
+        tokens = [
+            bytes_to_address(data) for data in aggregate(web3, [
+                (address, selector)
+                for address in missing
+                for selector in (TOKEN0_SELECTOR, TOKEN1_SELECTOR)
+            ], 'latest')
+        ]
+    except ValueError:
+        # A single call that reverts (e.g. something that isn't a pair)
+        # reverts the whole multicall, so split the batch until the
+        # offenders are on their own
+        if len(missing) == 1:
+            print(
+                'Could not prefetch the tokens of {}, not a pair?'.format(
+                    missing[0]
+                ),
+                file=sys.stderr
+            )
+            return
+
+        half = len(missing) // 2
+        prefetch_pair_tokens(web3, missing[:half])
+        prefetch_pair_tokens(web3, missing[half:])
+        return
+
+    for i, address in enumerate(missing):
+        PAIR_TOKENS[address] = (tokens[2 * i], tokens[2 * i + 1])
+
+
+def classify_relevance(first_is_pair, last_is_pair, is_left):
+    """ Attempts to figure out the relevance that OUSD has to a tx, from
+    whether our pair has the first and/or last swap of the tx and the
+    direction of the swap
+    """
+    from_ousd = first_is_pair and not is_left
+    to_ousd = last_is_pair and is_left
+
+    if from_ousd and to_ousd:
+        return 'in+out'
+    elif from_ousd:  # From OUSD
+        return 'in'
+    elif first_is_pair and is_left:  # Through OUSD
+        return 'through'
+    elif to_ousd:  # To OUSD
+        return 'out'
+    elif last_is_pair and not is_left:  # Through OUSD
+        return 'through'
+
+    # Deep middle kinda
+    return 'through'
+
+
+# (first_is_pair, last_is_pair, is_left) => token0 relevance
+RELEVANCE = {
+    key: classify_relevance(*key)
+    for key in product((False, True), repeat=3)
+}
+
+
+@lru_cache(maxsize=None)
+def pair_factory(web3):
+    """ Pair contract class, so the ABI is only processed once """
+    return web3.eth.contract(abi=PAIR_ABI)
+
+
+@lru_cache(maxsize=4096)
+def pair_contract(web3, pair_address):
+    """ Contract objects are costly to build, so build one per pair """
+    return pair_factory(web3)(address=pair_address)
+
+
+def get_pair_tokens(web3, pair_address):
+    """ Get (token0, token1) of a pair, only asking the node once per pair """
+    tokens = PAIR_TOKENS.get(pair_address)
+
+    if tokens is None:
+        tokens = PAIR_TOKENS[pair_address] = tuple(
+            bytes_to_address(web3.eth.call({
+                'to': pair_address,
+                'data': selector,
+            }))
+            for selector in (TOKEN0_SELECTOR, TOKEN1_SELECTOR)
+        )
+
+    return tokens
+
+
+def get_receipts(web3, tx_hashes, blocks):
+    """ Get the receipts of the given txs by tx hash, with one request per
+    block instead of one per tx where the node supports eth_getBlockReceipts
+    """
+    try:
+        block_receipts = concurrent_requests(web3, [
+            ('eth_getBlockReceipts', [to_block_identifier(block_number)])
+            for block_number in blocks
+        ])
+    except asyncio.TimeoutError:
+        # The per-tx requests would only make it worse
+        print('Timed out fetching block receipts', file=sys.stderr)
+        raise
+    except ValueError as error:
+        # Only fall back when the node doesn't have the method
+        if not is_method_not_found(error):
+            raise
+        block_receipts = None
+
+    # Some nodes answer null for blocks they don't serve, treat that like
+    # eth_getBlockReceipts being unsupported
+    if block_receipts is not None and None not in block_receipts:
+        return {
+            receipt.transactionHash.hex(): receipt
+            for receipts in block_receipts
+            for receipt in map(format_receipt, receipts)
+        }
+
+    return dict(zip(tx_hashes, map(format_receipt, concurrent_requests(
+        web3,
+        [('eth_getTransactionReceipt', [tx_hash]) for tx_hash in tx_hashes]
+    ))))
+
+
+def get_credits_per_token(web3, ousd, blocks):
+    """ Get rebasingCreditsPerToken() at each of the given blocks """
+    output_types = get_output_types(ousd, 'rebasingCreditsPerToken')
+    call = {
+        'to': ousd.address,
+        'data': ousd.encodeABI(fn_name='rebasingCreditsPerToken'),
+    }
+
+    return {
+        block_number: int(decode_call_result(output_types, result), 16)
+        for block_number, result in zip(blocks, concurrent_requests(web3, [
+            ('eth_call', [call, to_block_identifier(block_number)])
+            for block_number in blocks
+        ]))
+    }
 
 
 def parse_args(argv):
@@ -53,16 +217,13 @@ def parse_args(argv):
 
 
 def ousd_value_adjustment(token_balance, from_cpt, to_cpt):
-    token_balance = Decimal(token_balance)
-    from_cpt = Decimal(from_cpt)
-    to_cpt = Decimal(to_cpt)
-    credits = floor(token_balance * from_cpt / Decimal(1e18))
-    return floor(credits * Decimal(1e18) / to_cpt)
+    credits = token_balance * from_cpt // WAD
+    return credits * WAD // to_cpt
 
 
 def main():
     args = parse_args(sys.argv[1:])
-    web3 = Web3(Web3.HTTPProvider(args.endpoint))
+    web3 = make_web3(args.endpoint)
     ousd = web3.eth.contract(address=OUSD_ADDRESS, abi=OUSD_ABI)
     factory = web3.eth.contract(
         address=Web3.toChecksumAddress(args.factory),
@@ -86,132 +247,158 @@ def main():
         print('Unable to find pair {}-{}'.format(a, b), file=sys.stderr)
         sys.exit(1)
 
-    pair = web3.eth.contract(address=pair_address, abi=PAIR_ABI)
+    pair = pair_contract(web3, pair_address)
 
     # Token addresses
-    token0 = pair.functions.token0().call()
-    token1 = pair.functions.token1().call()
+    [token0, token1] = get_pair_tokens(web3, pair_address)
 
     # Zero reason this shouldn't match args
     assert token0 == a, "token0 != a"
     assert token1 == b, "token1 != b"
 
-    swap_filter = pair.events.Swap().createFilter(
-        fromBlock=start_block,
-        toBlock=end_block
-    )
-
-    for event in swap_filter.get_all_entries():
-        tx_hash = event.transactionHash.hex()
-
-        # Get the receipt for the tx
-        receipt = web3.eth.getTransactionReceipt(tx_hash)
-
-        # Skip failed transactions
-        if not receipt.status:
-            continue
-
-        # We don't use the address from the event because it may be a contract
-        # (e.g. UniswapRouterV02)
+    # Logs are fetched in windows and cached, see get_events_cached()
+    swap_event = pair.events.Swap()
+    swap_events = [
+        swap_event.processLog(log) for log in get_events_cached(
+            web3,
+            pair_address,
+            [SWAP_TOPIC],
+            start_block,
+            end_block
+        )
+    ]
+
+    # Fetch the receipts for all the txs, and the credits per token for each
+    # block if we need them, up front with concurrent async requests
+    tx_hashes = list(dict.fromkeys(
+        event.transactionHash.hex() for event in swap_events
+    ))
+    blocks = list(dict.fromkeys(event.blockNumber for event in swap_events))
+    receipts = get_receipts(web3, tx_hashes, blocks)
+    block_cpts = {}
+
+    if credits_per_token:
+        block_cpts = get_credits_per_token(web3, ousd, blocks)
+
+    # Decode the swaps of each tx, and look up the tokens of the pairs that
+    # start the swap chains all at once
+    swaps_by_tx = {
+        tx_hash: swap_event.processReceipt(receipts[tx_hash], errors=DISCARD)
+        for tx_hash in tx_hashes
+    }
+    prefetch_pair_tokens(web3, [
+        tx_swaps[0].address for tx_swaps in swaps_by_tx.values() if tx_swaps
+    ])
+
+    writer = csv.writer(sys.stdout, lineterminator='\n')
+
+    # Logs are in block and log order, so the events of a tx are adjacent
+    for tx_hash, tx_events in groupby(
+        swap_events,
+        key=lambda event: event.transactionHash.hex()
+    ):
+        # No need to check the status, reverted txs don't leave logs
+        receipt = receipts[tx_hash]
+
+        # We don't use the address from the event because it may be a
+        # contract (e.g. UniswapRouterV02)
         in_address = receipt['from']
-        out_address = event.args.to
-
-        direction = 'right'
-        if event.args.amount0Out > event.args.amount1Out:
-            direction = 'left'
 
-        # Weird math, unexpected "in" value can sometimes be due to unexpected
-        # balance in the pair contract that gets included in the swap
-        a_change = event.args.amount0In
-        b_change = event.args.amount1Out - event.args.amount1In
+        # All the swaps as part of this tx
+        tx_swaps = swaps_by_tx[tx_hash]
 
-        if direction == 'left':
-            a_change = event.args.amount0Out - event.args.amount0In
-            b_change = event.args.amount1In
+        if tx_swaps:
+            first_swap = tx_swaps[0]
+            last_swap = tx_swaps[-1]
 
-        token_in = token1 if direction == 'left' else token0
-        token_out = token0 if direction == 'left' else token1
-
-        token0_relevance = 'unknown'
-
-        # Get all the swaps as part of this tx
-        tx_swaps = pair.events.Swap().processReceipt(receipt, errors=DISCARD)
-
-        if len(tx_swaps) > 0:
             # Is first or last our pair?
-            first_is_pair = tx_swaps[0].address == pair_address
-            last_is_pair = tx_swaps[-1].address == pair_address
-            from_ousd = first_is_pair and direction == 'right'
-            to_ousd = last_is_pair and direction == 'left'
-
-            # Attempts to figure out the relevance that OUSD has to this tx
-            if from_ousd and to_ousd:
-                token0_relevance = 'in+out'
-            elif from_ousd:  # From OUSD
-                token0_relevance = 'in'
-            elif first_is_pair and direction == 'left':  # Through OUSD
-                token0_relevance = 'through'
-            elif to_ousd:  # To OUSD
-                token0_relevance = 'out'
-            elif last_is_pair and direction == 'right':  # Through OUSD
-                token0_relevance = 'through'
+            first_is_pair = first_swap.address == pair_address
+            last_is_pair = last_swap.address == pair_address
+
+        for event in tx_events:
+            args = event.args
+            out_address = args.to
+            amount0_in = args.amount0In
+            amount0_out = args.amount0Out
+            amount1_in = args.amount1In
+            amount1_out = args.amount1Out
+
+            # Weird math, unexpected "in" value can sometimes be due to
+            # unexpected balance in the pair contract that gets included in
+            # the swap
+            if amount0_out > amount1_out:
+                direction = 'left'
+                a_change = amount0_out - amount0_in
+                b_change = amount1_in
+                token_in = token1
+                token_out = token0
             else:
-                # Deep middle kinda
-                token0_relevance = 'through'
-
-            # Get the actual final token input/output
-            if not (from_ousd or to_ousd):
-                if not from_ousd:
-                    first_pair = web3.eth.contract(
-                        address=tx_swaps[0].address,
-                        abi=PAIR_ABI
-                    )
-                    if tx_swaps[0].args.amount0In > tx_swaps[0].args.amount1In:
-                        token_in = first_pair.functions.token0().call()
+                direction = 'right'
+                a_change = amount0_in
+                b_change = amount1_out - amount1_in
+                token_in = token0
+                token_out = token1
+
+            token0_relevance = 'unknown'
+
+            if tx_swaps:
+                from_ousd = first_is_pair and direction == 'right'
+                to_ousd = last_is_pair and direction == 'left'
+
+                token0_relevance = RELEVANCE[
+                    first_is_pair,
+                    last_is_pair,
+                    direction == 'left'
+                ]
+
+                # Get the actual final token input/output
+                if not (from_ousd or to_ousd):
+                    if not from_ousd:
+                        first_tokens = get_pair_tokens(
+                            web3,
+                            first_swap.address
+                        )
+                        if first_swap.args.amount0In > first_swap.args.amount1In:
+                            token_in = first_tokens[0]
+                        else:
+                            token_in = first_tokens[1]
                     else:
-                        token_in = first_pair.functions.token1().call()
-                else:
-                    last_pair = web3.eth.contract(
-                        address=tx_swaps[-1].address,
-                        abi=PAIR_ABI
-                    )
-                    if tx_swaps[-1].args.amount0Out > tx_swaps[-1].args.amount1Out:
-                        token_out = last_pair.functions.token0().call()
-                    else:
-                        token_out = last_pair.functions.token1().call()
-
-            # Update the out_address if there's a swap chain
-            for swap in tx_swaps:
-                if swap.args.to != out_address:
-                    out_address = swap.args.to
-
-        # OUSD price adjustment to get around after-hack craziness
-        if credits_per_token:
-            block_cpt = int(ousd.functions.rebasingCreditsPerToken().call(
-                block_identifier=event.blockNumber
-            ), 16)
-
-            a_change = ousd_value_adjustment(
+                        last_tokens = get_pair_tokens(
+                            web3,
+                            last_swap.address
+                        )
+                        if last_swap.args.amount0Out > last_swap.args.amount1Out:
+                            token_out = last_tokens[0]
+                        else:
+                            token_out = last_tokens[1]
+
+                # Update the out_address if there's a swap chain, which
+                # ends with the last swap of the tx
+                out_address = last_swap.args.to
+
+            # OUSD price adjustment to get around after-hack craziness
+            if credits_per_token:
+                a_change = ousd_value_adjustment(
+                    a_change,
+                    block_cpts[event.blockNumber],
+                    credits_per_token
+                )
+
+            # token0,token1,block_number,in_address,out_address,swap_direction,token0_amount,token1_amount,token_in,token_out,token0_relevance,tx_hash
+            writer.writerow((
+                a,
+                b,
+                event.blockNumber,
+                in_address,
+                out_address,
+                'buy' if direction == 'left' else 'sell',
                 a_change,
-                block_cpt,
-                credits_per_token
-            )
-
-        # token0,token1,block_number,in_address,out_address,swap_direction,token0_amount,token1_amount,token_in,token_out,token0_relevance,tx_hash
-        print('{},{},{},{},{},{},{},{},{},{},{},{}'.format(
-            a,
-            b,
-            event.blockNumber,
-            in_address,
-            out_address,
-            'buy' if direction == 'left' else 'sell',
-            a_change,
-            b_change,
-            token_in,
-            token_out,
-            token0_relevance,
-            tx_hash,
-        ))
+                b_change,
+                token_in,
+                token_out,
+                token0_relevance,
+                tx_hash,
+            ))
 
 
 if __name__ == "__main__":